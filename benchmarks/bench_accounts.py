@@ -0,0 +1,54 @@
+"""
+Per-account lookups by boolean mask versus AccountIndex slices, and
+calculate_metrics on an unsorted table versus an indexed one
+
+Usage: python -m benchmarks.bench_accounts [n_accounts] [trades_per_account] [lookups]
+"""
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import make_trades
+from src.analysis.metrics import calculate_metrics
+from src.data.accounts import AccountIndex, sort_by_account
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main(n_accounts=10_000, trades_per_account=100, lookups=200):
+    n_accounts, trades_per_account, lookups = int(n_accounts), int(trades_per_account), int(lookups)
+    trades = make_trades(n_accounts, trades_per_account)
+    trades = trades.sample(frac=1, random_state=0).reset_index(drop=True)
+
+    indexed, sort_seconds = timed(sort_by_account, trades)
+    index, index_seconds = timed(AccountIndex.from_sorted, indexed['Port_IDs'])
+    port_ids = np.random.default_rng(0).choice(index.port_ids, lookups)
+
+    start = time.perf_counter()
+    for port_id in port_ids:
+        indexed[indexed['Port_IDs'] == port_id]
+    mask_seconds = (time.perf_counter() - start) / lookups
+    start = time.perf_counter()
+    for port_id in port_ids:
+        index.rows(indexed, port_id)
+    slice_seconds = (time.perf_counter() - start) / lookups
+
+    _, unsorted_seconds = timed(calculate_metrics, trades)
+    _, indexed_seconds = timed(calculate_metrics, indexed, account_index=index)
+
+    print(f"{len(trades):,} trades, {len(index):,} accounts")
+    print(f"Sort by account:     {sort_seconds * 1e3:.1f}ms")
+    print(f"Build index:         {index_seconds * 1e3:.1f}ms")
+    print(f"Mask lookup:         {mask_seconds * 1e3:.3f}ms per account")
+    print(f"Index slice:         {slice_seconds * 1e3:.3f}ms per account ({mask_seconds / slice_seconds:.0f}x)")
+    print(f"Metrics, unsorted:   {unsorted_seconds:.3f}s")
+    print(f"Metrics, indexed:    {indexed_seconds:.3f}s ({unsorted_seconds / indexed_seconds:.1f}x)")
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
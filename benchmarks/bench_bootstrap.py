@@ -0,0 +1,34 @@
+"""
+Block-bootstrap confidence intervals over many accounts
+
+Usage: python -m benchmarks.bench_bootstrap [n_accounts] [n_resamples] [workers]
+"""
+import os
+import sys
+import time
+
+from src.analysis.bootstrap import bootstrap_metrics
+from benchmarks.synthetic import make_trades
+
+
+def main(n_accounts=10_000, n_resamples=1000, workers=None):
+    n_accounts, n_resamples = int(n_accounts), int(n_resamples)
+    workers = int(workers) if workers is not None else os.cpu_count() or 1
+    trades = make_trades(n_accounts, 100)
+
+    start = time.perf_counter()
+    serial = bootstrap_metrics(trades, n_resamples=n_resamples, workers=1)
+    serial_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    bootstrap_metrics(trades, n_resamples=n_resamples, workers=workers)
+    parallel_seconds = time.perf_counter() - start
+
+    print(f"{n_accounts:,} accounts x {n_resamples:,} resamples, "
+          f"{int(serial['trading_days'].mean())} trading days per account")
+    print(f"1 worker:   {serial_seconds:.2f}s")
+    print(f"{workers} workers: {parallel_seconds:.2f}s ({serial_seconds / parallel_seconds:.1f}x)")
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
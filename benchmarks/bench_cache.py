@@ -0,0 +1,46 @@
+"""
+Cold (parse + clean + write) versus warm (memory-mapped read) timings for
+the cleaned trade table cache
+
+Usage: python -m benchmarks.bench_cache [path_to_csv]
+"""
+import sys
+import tempfile
+import time
+
+from src.data.cache import TradeCache, content_key
+from src.data.loader import load_data, clean_data
+
+
+def load_cleaned(path, cache):
+    with open(path, 'rb') as f:
+        key = content_key(f.read(), 'cleaned')
+    cleaned = cache.get(key)
+    if cleaned is None:
+        cleaned = clean_data(load_data(path))
+        cache.put(key, cleaned)
+    return cleaned
+
+
+def main(path='TRADES_CopyTr_90D_ROI.csv'):
+    with tempfile.TemporaryDirectory() as directory:
+        cache = TradeCache(directory)
+
+        start = time.perf_counter()
+        load_cleaned(path, cache)
+        cold_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        load_cleaned(path, cache)
+        warm_seconds = time.perf_counter() - start
+
+        size = sum(size for _, size, _ in cache.entries())
+
+    print(f"Cold (parse, clean, write): {cold_seconds:.2f}s")
+    print(f"Warm (memory-mapped read):  {warm_seconds:.2f}s")
+    print(f"Speedup:                    {cold_seconds / warm_seconds:.1f}x")
+    print(f"Cache entry size:           {size / 2**20:,.1f} MiB")
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
@@ -0,0 +1,54 @@
+"""
+Row-wise apply versus the vectorized lookup-table classification for
+trade_type and position_type
+
+Usage: python -m benchmarks.bench_classify [n_trades]
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.data.loader import classify_trade, classify_trades, label_pairs
+from tests.reference import position_label
+
+
+def make_trades(n_trades, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'side': rng.choice(['BUY', 'SELL'], n_trades),
+        'positionSide': rng.choice(['LONG', 'SHORT', 'BOTH'], n_trades),
+    })
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main(n_trades=200_000):
+    trades = make_trades(int(n_trades))
+
+    cases = {
+        'trade_type': (
+            lambda: trades.apply(classify_trade, axis=1),
+            lambda: classify_trades(trades),
+        ),
+        'position_type': (
+            lambda: trades.apply(lambda x: position_label(x['side'], x['positionSide']), axis=1),
+            lambda: label_pairs(trades['side'], trades['positionSide'], position_label),
+        ),
+    }
+    for name, (rowwise, vectorized) in cases.items():
+        expected, rowwise_seconds = timed(rowwise)
+        result, vectorized_seconds = timed(vectorized)
+        print(
+            f"{name:>13}: apply {rowwise_seconds:.2f}s, vectorized {vectorized_seconds:.3f}s "
+            f"({rowwise_seconds / vectorized_seconds:,.0f}x, {len(trades):,} trades)"
+        )
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
@@ -0,0 +1,38 @@
+"""
+Memory of the exploded trade table before and after the dtype plan
+
+Usage: python -m benchmarks.bench_dtypes [path_to_csv]
+"""
+import sys
+import time
+
+import pandas as pd
+
+from src.data.columnar import TradeColumns
+from src.data.dtypes import apply_dtype_plan, memory_report
+from src.data.ingest import iter_trade_columns
+
+
+def main(path='TRADES_CopyTr_90D_ROI.csv'):
+    trade_columns = TradeColumns()
+    for chunk_columns, _ in iter_trade_columns(path):
+        trade_columns.extend(chunk_columns)
+    before = trade_columns.to_frame()
+    before['timestamp'] = pd.to_datetime(before.pop('time'), unit='ms')
+
+    start = time.perf_counter()
+    after = apply_dtype_plan(before.copy())
+    plan_seconds = time.perf_counter() - start
+
+    report = memory_report(before, after)
+    print(report.to_string(float_format='{:.1f}'.format))
+    total = report.loc['total']
+    print(f"\n{len(before):,} trades: {total['per_trade_before']:.1f} -> "
+          f"{total['per_trade_after']:.1f} bytes per trade "
+          f"({total['bytes_before'] / total['bytes_after']:.1f}x smaller), "
+          f"plan applied in {plan_seconds:.3f}s")
+    print(f"Constant columns: {after.attrs.get('constant_columns', {})}")
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
@@ -0,0 +1,44 @@
+"""
+Equity-curve cube build time and size, and per-account curve lookups
+against regrouping the raw trades
+
+Usage: python -m benchmarks.bench_equity [n_accounts] [trades_per_account]
+"""
+import sys
+import time
+
+from benchmarks.synthetic import make_trades
+from src.analysis.equity import RESOLUTIONS, EquityCube
+from tests.reference import regroup_curve
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main(n_accounts=50_000, trades_per_account=40):
+    n_accounts, trades_per_account = int(n_accounts), int(trades_per_account)
+    trades = make_trades(n_accounts, trades_per_account)
+    print(f"{n_accounts:,} accounts, {len(trades):,} trades")
+
+    cubes = {}
+    for resolution in RESOLUTIONS:
+        cubes[resolution], seconds = timed(EquityCube.from_trades, trades, resolution)
+        dense_bytes = len(cubes[resolution].accounts) * len(cubes[resolution].times()) * 8
+        print(f"{resolution} cube: built in {seconds:.3f}s, {cubes[resolution].nbytes / 2**20:,.1f} MiB "
+              f"sparse vs {dense_bytes / 2**20:,.1f} MiB dense")
+
+    _, seconds = timed(cubes['1m'].resample, '1d')
+    print(f"Resample 1m -> 1d: {seconds:.3f}s")
+
+    port_id = cubes['1h'].accounts[n_accounts // 2]
+    _, regroup_seconds = timed(regroup_curve, trades, port_id, 'h')
+    _, lookup_seconds = timed(cubes['1h'].equity_curve, port_id)
+    print(f"1h curve of one account: regroup {regroup_seconds * 1e3:.1f}ms, "
+          f"cube {lookup_seconds * 1e3:.2f}ms")
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
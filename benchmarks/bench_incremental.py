@@ -0,0 +1,41 @@
+"""
+Refreshing metrics with MetricsState.update versus a full recompute
+
+The history is split in time order; the last `delta_fraction` of fills
+arrives as one refresh batch.
+
+Usage: python -m benchmarks.bench_incremental [n_accounts] [trades_per_account] [delta_fraction]
+"""
+import sys
+import time
+
+from src.analysis.incremental import MetricsState
+from src.analysis.metrics import calculate_metrics
+from benchmarks.synthetic import make_trades
+
+
+def main(n_accounts=10_000, trades_per_account=100, delta_fraction=0.01):
+    n_accounts, trades_per_account = int(n_accounts), int(trades_per_account)
+    trades = make_trades(n_accounts, trades_per_account)
+    trades = trades.sort_values('timestamp', kind='stable', ignore_index=True)
+    split = int(len(trades) * (1 - float(delta_fraction)))
+    history, delta = trades.iloc[:split], trades.iloc[split:]
+
+    state = MetricsState().update(history)
+
+    start = time.perf_counter()
+    calculate_metrics(trades)
+    full_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    state.update(delta)
+    state.metrics()
+    incremental_seconds = time.perf_counter() - start
+
+    print(f"{n_accounts:,} accounts, {len(history):,} trades + {len(delta):,} new")
+    print(f"Full recompute:     {full_seconds:.3f}s")
+    print(f"Incremental update: {incremental_seconds:.3f}s ({full_seconds / incremental_seconds:,.1f}x)")
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
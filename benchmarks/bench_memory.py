@@ -0,0 +1,116 @@
+"""
+Measure peak RSS of the ingestion modes:
+
+  dicts     one dict per trade, then pd.DataFrame(list) (the old approach)
+  columnar  whole CSV in memory, parsed into TradeColumns
+  chunked   CSV read in memory-budgeted chunks, columns kept
+  reduced   CSV read in memory-budgeted chunks, each chunk reduced to
+            per-account PnL and dropped
+
+Each mode runs in a fresh interpreter so ru_maxrss reflects that mode only.
+
+Usage: python -m benchmarks.bench_memory [path_to_csv]
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+
+import pandas as pd
+
+from src.data.columnar import TradeColumns
+from src.data.ingest import iter_trade_columns
+from src.data.parser import parse_trade_history
+from tests.reference import build_from_dicts
+
+MEMORY_BUDGET = 32 * 1024 ** 2
+
+
+def peak_rss_bytes():
+    """
+    Peak resident set size of this process
+
+    Linux reports VmHWM, which starts afresh at exec; ru_maxrss (KiB on
+    Linux, bytes on macOS) can carry over a large parent's peak.
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def build_columnar(path):
+    data = pd.read_csv(path).dropna(subset=['Trade_History'])
+    trade_columns = TradeColumns()
+    for port_id, history in zip(data['Port_IDs'], data['Trade_History']):
+        columns, n_records = parse_trade_history(history)
+        trade_columns.append(columns, n_records, port_id)
+    return trade_columns.to_frame()
+
+
+def build_chunked(path):
+    trade_columns = TradeColumns()
+    for chunk_columns, _ in iter_trade_columns(path, MEMORY_BUDGET):
+        trade_columns.extend(chunk_columns)
+    return trade_columns.to_frame()
+
+
+def build_reduced(path):
+    totals = []
+    for chunk_columns, _ in iter_trade_columns(path, MEMORY_BUDGET):
+        if not len(chunk_columns):
+            continue
+        chunk = chunk_columns.to_frame()
+        totals.append(chunk.groupby('Port_IDs')['realizedProfit'].sum())
+    return pd.concat(totals).groupby(level=0).sum().to_frame()
+
+
+MODES = {
+    'dicts': build_from_dicts,
+    'columnar': build_columnar,
+    'chunked': build_chunked,
+    'reduced': build_reduced,
+}
+
+
+def run_mode(mode, path):
+    baseline = peak_rss_bytes()
+    frame = MODES[mode](path)
+    print(json.dumps({
+        'rows': len(frame),
+        'frame_bytes': int(frame.memory_usage(deep=True).sum()),
+        'peak_bytes': peak_rss_bytes() - baseline,
+    }))
+
+
+def measure_mode(mode, path):
+    """Run one mode in a fresh interpreter; returns its rows, frame_bytes and peak_bytes"""
+    output = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.bench_memory', '--mode', mode, str(path)],
+        check=True, capture_output=True, text=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    ).stdout
+    return json.loads(output)
+
+
+def main(path='TRADES_CopyTr_90D_ROI.csv'):
+    for mode in MODES:
+        result = measure_mode(mode, os.path.abspath(path))
+        print(
+            f"{mode:>9}: peak +{result['peak_bytes'] / 2**20:,.0f} MiB "
+            f"for a {result['frame_bytes'] / 2**20:,.1f} MiB result "
+            f"({result['rows']:,} rows)"
+        )
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--mode']:
+        run_mode(*sys.argv[2:4])
+    else:
+        main(*sys.argv[1:])
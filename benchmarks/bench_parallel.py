@@ -0,0 +1,35 @@
+"""
+Time Trade_History ingestion for increasing process-pool sizes
+
+Usage: python -m benchmarks.bench_parallel [path_to_csv]
+"""
+import os
+import sys
+import time
+
+import pandas as pd
+
+from src.data.ingest import parse_histories_parallel
+
+
+def main(path='TRADES_CopyTr_90D_ROI.csv'):
+    data = pd.read_csv(path)
+    port_ids = data['Port_IDs'].tolist()
+    histories = data['Trade_History'].tolist()
+
+    cpu_count = os.cpu_count() or 1
+    worker_counts = [w for w in (1, 2, 4, 8, 16) if w < cpu_count] + [cpu_count]
+
+    baseline = None
+    for workers in worker_counts:
+        start = time.perf_counter()
+        trade_columns, _ = parse_histories_parallel(port_ids, histories, workers=workers)
+        trade_columns.to_frame()
+        seconds = time.perf_counter() - start
+
+        baseline = baseline or seconds
+        print(f"workers={workers:>2}: {seconds:.2f}s ({baseline / seconds:.1f}x)")
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
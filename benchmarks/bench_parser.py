@@ -0,0 +1,34 @@
+"""
+Compare the Trade_History fast parser against the ast.literal_eval fallback
+
+Usage: python -m benchmarks.bench_parser [path_to_csv]
+"""
+import sys
+import time
+
+import pandas as pd
+
+from src.data.parser import parse_trade_history
+from tests.reference import build_frame, parse_with_ast
+
+
+def main(path='TRADES_CopyTr_90D_ROI.csv'):
+    data = pd.read_csv(path).dropna(subset=['Trade_History'])
+    histories = list(zip(data['Port_IDs'], data['Trade_History']))
+
+    start = time.perf_counter()
+    build_frame(histories, parse_with_ast)
+    ast_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = build_frame(histories, parse_trade_history)
+    fast_seconds = time.perf_counter() - start
+
+    print(f"Trades parsed:     {len(result):,}")
+    print(f"ast.literal_eval:  {ast_seconds:.2f}s")
+    print(f"fast parser:       {fast_seconds:.2f}s")
+    print(f"Speedup:           {ast_seconds / fast_seconds:.1f}x")
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
@@ -0,0 +1,33 @@
+"""
+Per-fill Python loop versus the vectorized position reconstruction
+
+Usage: python -m benchmarks.bench_positions [n_accounts] [trades_per_account]
+"""
+import sys
+import time
+
+from benchmarks.synthetic import make_trades
+from src.analysis.positions import reconstruct_positions
+from tests.reference import loop_positions
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main(n_accounts=2_000, trades_per_account=100):
+    n_accounts, trades_per_account = int(n_accounts), int(trades_per_account)
+    trades = make_trades(n_accounts, trades_per_account)
+
+    _, loop_seconds = timed(loop_positions, trades)
+    positions, vector_seconds = timed(reconstruct_positions, trades)
+
+    print(f"{len(trades):,} fills -> {len(positions):,} positions")
+    print(f"Python loop: {loop_seconds:.3f}s")
+    print(f"Vectorized:  {vector_seconds:.3f}s ({loop_seconds / vector_seconds:.1f}x)")
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
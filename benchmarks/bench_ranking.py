@@ -0,0 +1,85 @@
+"""
+Full sort versus partial top-N selection in rank_accounts
+
+Usage: python -m benchmarks.bench_ranking [n_accounts] [top_n]
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.analysis.ranking import (
+    WEIGHT_PROFILES,
+    metric_matrix,
+    rank_accounts,
+    score_accounts,
+    score_profiles,
+    weight_sensitivity,
+)
+from tests.reference import full_sort
+
+
+def make_metrics(n_accounts, seed=0):
+    """Random metrics frame shaped like calculate_metrics output"""
+    rng = np.random.default_rng(seed)
+    total_positions = rng.integers(1, 500, n_accounts)
+    win_positions = rng.binomial(total_positions, 0.5)
+    total_pnl = rng.normal(0, 1000, n_accounts)
+    total_fees = rng.exponential(50, n_accounts)
+    turnover = rng.exponential(1e5, n_accounts)
+    return pd.DataFrame({
+        'roi': rng.normal(0, 5, n_accounts),
+        'total_pnl': total_pnl,
+        'sharpe_ratio': rng.normal(0, 2, n_accounts),
+        'max_drawdown': rng.exponential(20, n_accounts),
+        'win_rate': win_positions / total_positions * 100,
+        'win_positions': win_positions,
+        'total_positions': total_positions,
+        'net_pnl': total_pnl - total_fees,
+        'total_fees': total_fees,
+        'fee_drag': total_fees / turnover * 100,
+        'turnover': turnover,
+        'fee_to_profit': rng.exponential(0.1, n_accounts),
+    }, index=rng.choice(10 ** 18, n_accounts, replace=False))
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main(n_accounts=1_000_000, top_n=20):
+    n_accounts, top_n = int(n_accounts), int(top_n)
+    metrics = make_metrics(n_accounts)
+
+    _, sort_seconds = timed(full_sort, metrics, top_n)
+    _, partial_seconds = timed(rank_accounts, metrics, top_n)
+    scores, score_seconds = timed(score_accounts, metrics)
+
+    # The first lookup builds the index's hash table; time a later one
+    port_id = metrics.index[n_accounts // 2]
+    scores.at[metrics.index[0], 'Rank']
+    _, lookup_seconds = timed(lambda: scores.at[port_id, 'Rank'])
+
+    print(f"{n_accounts:,} accounts, top {top_n}")
+    print(f"Full sort:              {sort_seconds:.3f}s")
+    print(f"Partial top-N:          {partial_seconds:.3f}s ({sort_seconds / partial_seconds:.1f}x)")
+    print(f"Scores + ranks for all: {score_seconds:.3f}s")
+    print(f"Rank lookup:            {lookup_seconds * 1e6:.0f}us")
+
+    # Switching or sweeping profiles reuses one normalized matrix
+    matrix, matrix_seconds = timed(metric_matrix, metrics)
+    _, profiles_seconds = timed(score_profiles, metrics, matrix=matrix)
+    print(f"Metric matrix:          {matrix_seconds:.3f}s")
+    print(f"Score {len(WEIGHT_PROFILES)} profiles:       {profiles_seconds:.3f}s")
+
+    # Rank stability sweep over a slice of the population
+    sweep_accounts = min(n_accounts, 10_000)
+    _, sweep_seconds = timed(weight_sensitivity, metrics.iloc[:sweep_accounts], n_samples=1000)
+    print(f"Sweep {sweep_accounts:,} accounts x 1,000 weights: {sweep_seconds:.3f}s")
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
@@ -0,0 +1,47 @@
+"""
+Scaling of calculate_sharpe_ratio and calculate_mdd with the number of
+accounts, against the previous per-account boolean-mask loops
+
+The loops are O(accounts x trades), so they only run up to
+LOOP_MAX_ACCOUNTS accounts.
+
+Usage: python -m benchmarks.bench_scaling [trades_per_account]
+"""
+import sys
+import time
+
+from src.analysis.metrics import calculate_mdd, calculate_sharpe_ratio
+from benchmarks.synthetic import make_trades
+from tests.reference import mdd_loop, sharpe_loop
+
+ACCOUNT_COUNTS = [100, 1_000, 10_000, 50_000]
+LOOP_MAX_ACCOUNTS = 10_000
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main(trades_per_account=20):
+    print(f"{'accounts':>9} {'trades':>10} {'sharpe loop':>12} {'sharpe':>8} {'mdd loop':>9} {'mdd':>8}")
+    for n_accounts in ACCOUNT_COUNTS:
+        trades = make_trades(n_accounts, int(trades_per_account))
+        _, sharpe_seconds = timed(calculate_sharpe_ratio, trades)
+        _, mdd_seconds = timed(calculate_mdd, trades)
+
+        loop_columns = ['-', '-']
+        if n_accounts <= LOOP_MAX_ACCOUNTS:
+            _, sharpe_loop_seconds = timed(sharpe_loop, trades)
+            _, mdd_loop_seconds = timed(mdd_loop, trades)
+            loop_columns = [f"{sharpe_loop_seconds:.2f}s", f"{mdd_loop_seconds:.2f}s"]
+
+        print(
+            f"{n_accounts:>9,} {len(trades):>10,} {loop_columns[0]:>12} {sharpe_seconds:>7.3f}s "
+            f"{loop_columns[1]:>9} {mdd_seconds:>7.3f}s"
+        )
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
@@ -0,0 +1,53 @@
+"""
+Append rolling 90-day exports to a TradeStore, then time opening it and
+range queries by day and by account
+
+Usage: python -m benchmarks.bench_store [n_accounts] [trades_per_account] [weeks]
+"""
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import make_trades
+from src.data.store import TradeStore
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main(n_accounts=5_000, trades_per_account=200, weeks=4):
+    n_accounts, trades_per_account, weeks = int(n_accounts), int(trades_per_account), int(weeks)
+    days = 90 + 7 * (weeks - 1)
+    history = make_trades(n_accounts, trades_per_account * days // 90, days=days)
+    last_day = history['timestamp'].max().normalize() + pd.Timedelta(days=1)
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = TradeStore(directory)
+        for week in range(weeks):
+            end = last_day - pd.Timedelta(days=7 * (weeks - 1 - week))
+            export = history[(history['timestamp'] >= end - pd.Timedelta(days=90)) &
+                             (history['timestamp'] < end)]
+            added, seconds = timed(store.append, export, source=f"week {week + 1}")
+            print(f"Export {week + 1}: {len(export):,} trades, {added:,} new, appended in {seconds:.3f}s")
+
+        store, open_seconds = timed(TradeStore, directory)
+        trades, read_seconds = timed(store.read)
+        day = store.days[len(store.days) // 2]
+        one_day, day_seconds = timed(store.read, day, pd.Timestamp(day) + pd.Timedelta(days=1))
+        port_id = history['Port_IDs'].iloc[len(history) // 2]
+        one_account, account_seconds = timed(store.read, port_ids=port_id)
+
+        print(f"\n{store.n_trades:,} trades over {len(store.days)} days")
+        print(f"Open:        {open_seconds * 1e3:.1f}ms")
+        print(f"Read all:    {read_seconds * 1e3:.1f}ms ({len(trades):,} trades)")
+        print(f"One day:     {day_seconds * 1e3:.1f}ms ({len(one_day):,} trades)")
+        print(f"One account: {account_seconds * 1e3:.1f}ms ({len(one_account):,} trades)")
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
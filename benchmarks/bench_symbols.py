@@ -0,0 +1,41 @@
+"""
+Per-(account, symbol) metrics: one factorized pair key against running
+calculate_metrics once per symbol, and the sparse result size against a
+dense accounts x symbols grid
+
+Usage: python -m benchmarks.bench_symbols [n_accounts] [trades_per_account] [n_symbols]
+"""
+import sys
+import time
+
+from benchmarks.synthetic import make_trades
+from src.analysis.metrics import calculate_symbol_metrics
+from tests.reference import per_symbol_metrics
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main(n_accounts=10_000, trades_per_account=100, n_symbols=300):
+    n_accounts, trades_per_account, n_symbols = int(n_accounts), int(trades_per_account), int(n_symbols)
+    trades = make_trades(n_accounts, trades_per_account, n_symbols=n_symbols)
+
+    metrics, kernel_seconds = timed(calculate_symbol_metrics, trades)
+    _, loop_seconds = timed(per_symbol_metrics, trades)
+
+    n_accounts = metrics.index.get_level_values('Port_IDs').nunique()
+    n_symbols = metrics.index.get_level_values('symbol').nunique()
+    dense_bytes = n_accounts * n_symbols * metrics.shape[1] * 8
+    print(f"{len(trades):,} trades, {len(metrics):,} traded pairs "
+          f"of {n_accounts:,} accounts x {n_symbols:,} symbols")
+    print(f"Pair-key kernel:                {kernel_seconds:.3f}s")
+    print(f"calculate_metrics per symbol:   {loop_seconds:.3f}s ({loop_seconds / kernel_seconds:.1f}x)")
+    print(f"Result: {metrics.memory_usage(deep=True).sum() / 2**20:,.1f} MiB sparse "
+          f"vs {dense_bytes / 2**20:,.1f} MiB dense")
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
@@ -0,0 +1,171 @@
+"""
+Timed benchmark suite for the analysis pipeline
+
+Generates a synthetic Port_IDs,Trade_History CSV (or uses --csv), times
+load_data, clean_data, calculate_metrics, rank_accounts and
+calculate_feature_engineering, and writes the timings as JSON
+(default: benchmarks/results/<commit>.json).  Pass --compare with an
+earlier results file to flag stages that got slower; the exit status is 1
+if any did.
+
+Usage: python -m benchmarks.suite [--accounts N] [--trades-per-account N]
+                                  [--symbols N] [--days N] [--repeat N]
+                                  [--csv PATH] [--output PATH]
+                                  [--compare BASELINE] [--threshold RATIO]
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import write_trades_csv
+from src.analysis.metrics import calculate_metrics
+from src.analysis.ranking import rank_accounts
+from src.data.loader import clean_data, load_data
+from src.data.reporting import LoggingReporter
+from src.utils.helpers import calculate_feature_engineering
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.suite', description=__doc__.split('\n')[1])
+    parser.add_argument('--accounts', type=int, default=1_000, help="synthetic accounts (default: 1000)")
+    parser.add_argument('--trades-per-account', type=int, default=200,
+                        help="mean trades per synthetic account (default: 200)")
+    parser.add_argument('--symbols', type=int, default=6, help="synthetic trading pairs (default: 6)")
+    parser.add_argument('--days', type=int, default=90, help="days of synthetic history (default: 90)")
+    parser.add_argument('--seed', type=int, default=0, help="synthetic data seed (default: 0)")
+    parser.add_argument('--repeat', type=int, default=3, help="timed runs per stage (default: 3)")
+    parser.add_argument('--csv', help="benchmark this CSV instead of synthetic data")
+    parser.add_argument('--output', help="results file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument('--compare', metavar='BASELINE', help="results file to compare against")
+    parser.add_argument('--threshold', type=float, default=1.10,
+                        help="best-time ratio above which a stage counts as a regression (default: 1.10)")
+    return parser.parse_args(argv)
+
+
+def git_commit():
+    """Short hash of HEAD, or None outside a git checkout"""
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def time_stage(function, make_inputs, repeat):
+    """Wall-clock seconds of function(*make_inputs()) over repeat runs; inputs are built untimed"""
+    runs = []
+    for _ in range(repeat):
+        inputs = make_inputs()
+        start = time.perf_counter()
+        function(*inputs)
+        runs.append(time.perf_counter() - start)
+    return {'best': min(runs), 'median': statistics.median(runs), 'runs': runs}
+
+
+def run_suite(csv_path, repeat):
+    """Time every stage on one CSV; returns (dataset info, {stage: timings})"""
+    reporter = LoggingReporter()
+    loaded = load_data(csv_path, reporter=reporter)
+    cleaned = clean_data(loaded)
+    metrics = calculate_metrics(cleaned)
+
+    stages = {
+        'load_data': (lambda path: load_data(path, reporter=reporter), lambda: (csv_path,)),
+        'clean_data': (clean_data, lambda: (loaded,)),
+        'calculate_metrics': (calculate_metrics, lambda: (cleaned,)),
+        'rank_accounts': (rank_accounts, lambda: (metrics,)),
+        'calculate_feature_engineering': (calculate_feature_engineering, lambda: (cleaned,)),
+    }
+    timings = {}
+    for name, (function, make_inputs) in stages.items():
+        timings[name] = time_stage(function, make_inputs, repeat)
+        print(f"{name:<32}{timings[name]['best']:>9.3f}s best  {timings[name]['median']:>9.3f}s median")
+
+    dataset = {'trades': len(cleaned), 'accounts': int(cleaned['Port_IDs'].nunique())}
+    return dataset, timings
+
+
+def compare(results, baseline, threshold):
+    """Print best-time ratios against a baseline; returns the regressed stages"""
+    if results['params'] != baseline['params']:
+        print("Warning: baseline was run with different parameters; ratios are not comparable")
+
+    print(f"\nAgainst {baseline.get('commit') or 'baseline'} (regression above {threshold:.2f}x):")
+    regressions = []
+    for name, timings in results['stages'].items():
+        if name not in baseline['stages']:
+            print(f"{name:<32}{'new':>9}")
+            continue
+        ratio = timings['best'] / baseline['stages'][name]['best']
+        status = ''
+        if ratio > threshold:
+            status = 'REGRESSION'
+            regressions.append(name)
+        print(f"{name:<32}{baseline['stages'][name]['best']:>9.3f}s -> {timings['best']:.3f}s"
+              f"  {ratio:>5.2f}x  {status}")
+    return regressions
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    commit = git_commit()
+    params = {
+        'accounts': args.accounts,
+        'trades_per_account': args.trades_per_account,
+        'symbols': args.symbols,
+        'days': args.days,
+        'seed': args.seed,
+        'csv': os.path.basename(args.csv) if args.csv else None,
+    }
+
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = args.csv
+        if csv_path is None:
+            csv_path = os.path.join(directory, 'trades.csv')
+            write_trades_csv(csv_path, args.accounts, args.trades_per_account, args.symbols,
+                             args.days, args.seed)
+        dataset, timings = run_suite(csv_path, args.repeat)
+
+    results = {
+        'commit': commit,
+        'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'cpu_count': os.cpu_count(),
+        'params': params,
+        'dataset': dataset,
+        'stages': timings,
+    }
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit or 'local'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Wrote {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""
+Synthetic trade data for benchmarks
+
+make_trades builds a cleaned-style trade frame in memory; write_trades_csv
+writes the same trades as a Port_IDs,Trade_History CSV laid out exactly like
+TRADES_CopyTr_90D_ROI.csv.
+"""
+import numpy as np
+import pandas as pd
+
+SYMBOLS = [
+    'BTCUSDT', 'ETHUSDT', 'SOLUSDT', 'DOGEUSDT', 'BNBUSDT', 'XRPUSDT',
+    'ADAUSDT', 'AVAXUSDT', 'LINKUSDT', 'DOTUSDT', 'LTCUSDT', 'TRXUSDT',
+]
+
+# Keys of a Trade_History record, in the order Binance exports them
+TRADE_HISTORY_FIELDS = (
+    'time', 'symbol', 'side', 'price', 'fee', 'feeAsset', 'quantity', 'quantityAsset',
+    'realizedProfit', 'realizedProfitAsset', 'baseAsset', 'qty', 'positionSide', 'activeBuy',
+)
+
+
+def make_trades(n_accounts, trades_per_account, n_symbols=6, days=90, seed=0):
+    """
+    Build a cleaned-style trade frame (one row per fill)
+
+    Trades per account vary around trades_per_account; timestamps are
+    spread over the last `days` days ending 2024-06-20.
+    """
+    rng = np.random.default_rng(seed)
+    counts = rng.poisson(trades_per_account, n_accounts).clip(min=1)
+    n_trades = int(counts.sum())
+
+    port_ids = np.repeat(
+        3_700_000_000_000_000_000 + rng.choice(10 ** 17, n_accounts, replace=False),
+        counts
+    )
+    end = pd.Timestamp('2024-06-20').value // 10 ** 6
+    time = end - rng.integers(0, days * 86_400_000, n_trades)
+
+    if n_symbols <= len(SYMBOLS):
+        symbols = np.array(SYMBOLS[:n_symbols])
+    else:
+        symbols = np.array([f"SYM{i}USDT" for i in range(n_symbols)])
+    symbol = symbols[rng.integers(0, n_symbols, n_trades)]
+
+    side = np.where(rng.random(n_trades) < 0.5, 'BUY', 'SELL')
+    position_side = np.array(['LONG', 'SHORT', 'BOTH'])[rng.integers(0, 3, n_trades)]
+    price = np.round(rng.lognormal(3, 2, n_trades), 5)
+    qty = np.round(rng.lognormal(2, 1.5, n_trades), 3)
+    quantity = np.round(price * qty, 5)
+    closing = rng.random(n_trades) < 0.5
+    realized = np.where(closing, np.round(rng.normal(0.2, 5, n_trades), 8), 0.0)
+    fee = -np.round(quantity * 0.0004, 8)
+
+    trades = pd.DataFrame({
+        'symbol': symbol,
+        'side': side,
+        'price': price,
+        'fee': fee,
+        'feeAsset': 'USDT',
+        'quantity': quantity,
+        'quantityAsset': 'USDT',
+        'realizedProfit': realized,
+        'realizedProfitAsset': 'USDT',
+        'baseAsset': pd.Series(symbol).str.replace('USDT', '', regex=False).to_numpy(),
+        'qty': qty,
+        'positionSide': position_side,
+        'activeBuy': rng.random(n_trades) < 0.5,
+        'Port_IDs': port_ids,
+        'timestamp': pd.to_datetime(time, unit='ms'),
+    })
+    return trades
+
+
+def _literals(values):
+    """Python literal of every value, as it appears inside Trade_History"""
+    values = np.asarray(values)
+    if values.dtype == bool:
+        return np.where(values, 'True', 'False').astype(object)
+    if values.dtype.kind in 'OUT':
+        return ("'" + pd.Series(values, dtype=object).astype(str) + "'").to_numpy()
+    # numpy prints float64 with the same shortest repr as Python
+    return values.astype(str).astype(object)
+
+
+def write_trades_csv(path, n_accounts, trades_per_account, n_symbols=6, days=90, seed=0):
+    """
+    Write make_trades(...) as a Port_IDs,Trade_History CSV
+
+    Each row holds one account and its trades as a list of Python dict
+    literals, newest first, with the keys of TRADE_HISTORY_FIELDS, just as
+    in the Binance export.  Returns the trade frame that was written.
+    """
+    trades = make_trades(n_accounts, trades_per_account, n_symbols, days, seed)
+    trades['time'] = trades['timestamp'].to_numpy().astype('datetime64[ms]').astype(np.int64)
+
+    # Accounts in generation order, each one's trades newest first
+    account_codes, port_ids = pd.factorize(trades['Port_IDs'])
+    order = np.lexsort((-trades['time'].to_numpy(), account_codes))
+    ordered = trades.iloc[order]
+
+    records = pd.Series('{', index=range(len(ordered)), dtype=object)
+    for i, field in enumerate(TRADE_HISTORY_FIELDS):
+        separator = ', ' if i else ''
+        records += f"{separator}'{field}': " + _literals(ordered[field].to_numpy())
+    records += '}'
+
+    bounds = np.r_[0, np.cumsum(np.bincount(account_codes, minlength=len(port_ids)))]
+    records = records.tolist()
+    histories = [
+        '[' + ', '.join(records[start:stop]) + ']'
+        for start, stop in zip(bounds[:-1], bounds[1:])
+    ]
+    pd.DataFrame({'Port_IDs': port_ids, 'Trade_History': histories}).to_csv(path, index=False)
+    return trades
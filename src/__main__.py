@@ -0,0 +1,83 @@
+"""
+Rank accounts from a trade CSV without the Streamlit UI
+
+Usage: python -m src TRADES.csv [--output-dir DIR] [--top-n N] [--profile NAME]
+                                [--workers N] [--memory-budget MIB]
+
+Writes rankings.csv (the top N accounts) and metrics.csv (every account)
+to the output directory.  In metrics.csv, fee_to_profit is left empty for
+accounts without winning trades.
+"""
+import argparse
+import logging
+import os
+import sys
+
+from .analysis.metrics import calculate_metrics
+from .analysis.ranking import WEIGHT_PROFILES, rank_accounts
+from .data.loader import clean_data, load_data
+from .data.reporting import LoggingReporter, PipelineStopped
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m src',
+        description="Rank Binance copy-trading accounts from a trade history CSV"
+    )
+    parser.add_argument('csv_path',
+                        help="CSV with Port_IDs and Trade_History columns, or a trade store directory")
+    parser.add_argument('-o', '--output-dir', default='.',
+                        help="directory for rankings.csv and metrics.csv (default: .)")
+    parser.add_argument('-n', '--top-n', type=int, default=20,
+                        help="number of accounts in rankings.csv (default: 20)")
+    parser.add_argument('-p', '--profile', choices=list(WEIGHT_PROFILES), default='balanced',
+                        help="weight profile used for ranking (default: balanced)")
+    parser.add_argument('-w', '--workers', type=int, default=1,
+                        help="processes used to parse trade histories; 0 uses every core (default: 1)")
+    parser.add_argument('-m', '--memory-budget', type=int, metavar='MIB',
+                        help="read the CSV in chunks that fit this much working memory")
+    parser.add_argument('-q', '--quiet', action='store_true', help="only log warnings and errors")
+    return parser.parse_args(argv)
+
+
+def run(csv_path, output_dir='.', top_n=20, profile='balanced', workers=1, memory_budget=None,
+        reporter=None):
+    """Run load -> clean -> metrics -> rank and write the result files"""
+    reporter = reporter or LoggingReporter()
+    data = load_data(
+        csv_path,
+        workers=workers or None,
+        memory_budget=memory_budget * 1024 ** 2 if memory_budget else None,
+        reporter=reporter
+    )
+    cleaned_data = clean_data(data)
+    metrics = calculate_metrics(cleaned_data)
+    rankings = rank_accounts(metrics, top_n=top_n, weights=profile)
+
+    os.makedirs(output_dir, exist_ok=True)
+    rankings_path = os.path.join(output_dir, 'rankings.csv')
+    metrics_path = os.path.join(output_dir, 'metrics.csv')
+    rankings.to_csv(rankings_path, index=False)
+    metrics.to_csv(metrics_path, index_label='Port_IDs')
+    reporter.info(f"Wrote {len(rankings):,} rankings to {rankings_path}")
+    reporter.info(f"Wrote metrics for {len(metrics):,} accounts to {metrics_path}")
+    return rankings, metrics
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(
+        level=logging.WARNING if args.quiet else logging.INFO,
+        format='%(levelname)s: %(message)s'
+    )
+    try:
+        run(args.csv_path, args.output_dir, args.top_n, args.profile, args.workers,
+            args.memory_budget)
+    except PipelineStopped:
+        # The reporter has already logged the error
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,181 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .metrics import _factorize_accounts, _local_timestamps, _sort_segments
+
+# Metrics with bootstrap confidence intervals
+BOOTSTRAP_METRICS = ('sharpe_ratio', 'win_rate', 'roi')
+
+# Accounts per shard.  Every shard gets its own child seed, so results
+# depend on the seed but not on how many workers run the shards.
+ACCOUNTS_PER_SHARD = 1000
+
+# Resamples drawn at once within a shard; bounds the working memory
+RESAMPLE_BATCH = 100
+
+# Daily sums per account, in the order they are stacked for resampling
+_DAILY_FIELDS = ('centered_pnl', 'centered_pnl_squared', 'wins', 'trades', 'quantity')
+
+
+def _daily_table(trades_df):
+    """
+    Per-account daily sums, for accounts sorted like calculate_metrics
+
+    Returns (accounts, n_days, daily) where daily maps field name to one
+    value per (account, day), accounts contiguous and days in order.
+    """
+    codes, accounts, valid = _factorize_accounts(trades_df, sort=True)
+    codes, timestamps, pnl, quantity = _sort_segments(
+        codes[valid],
+        _local_timestamps(trades_df['timestamp'])[valid],
+        trades_df['realizedProfit'].to_numpy(dtype=np.float64)[valid],
+        trades_df['quantity'].to_numpy(dtype=np.float64)[valid],
+    )
+
+    days = timestamps.astype('datetime64[D]').view(np.int64)
+    day_starts = np.flatnonzero(np.r_[True, (codes[1:] != codes[:-1]) | (days[1:] != days[:-1])])
+    daily = {
+        'pnl': np.add.reduceat(np.nan_to_num(pnl), day_starts),
+        'quantity': np.add.reduceat(np.nan_to_num(quantity), day_starts),
+        'wins': np.add.reduceat((pnl > 0).astype(np.float64), day_starts),
+        'trades': np.diff(np.r_[day_starts, len(codes)]).astype(np.float64),
+    }
+    n_days = np.bincount(codes[day_starts], minlength=len(accounts))
+    return accounts, n_days, daily
+
+
+def _prefix_sums(n_days, daily):
+    """
+    Per-account prefix sums of the daily fields over the series repeated
+    twice, so a block that wraps around the end is still one range
+
+    Returns (mean daily PnL per account, row stride, array of shape
+    (accounts * stride, fields)).  Each account's sums start from 0, so a
+    range sum never mixes in another account's values; PnL is centred on
+    the account mean to keep the sum of squares accurate.
+    """
+    owner = np.repeat(np.arange(len(n_days)), n_days)
+    position = np.arange(len(owner)) - np.repeat(np.r_[0, np.cumsum(n_days)[:-1]], n_days)
+    mean_pnl = np.bincount(owner, weights=daily['pnl'], minlength=len(n_days)) / n_days
+    centered = daily['pnl'] - mean_pnl[owner]
+    values = {
+        'centered_pnl': centered,
+        'centered_pnl_squared': centered ** 2,
+        **daily,
+    }
+
+    stride = 2 * n_days.max() + 1
+    prefix = np.zeros((len(n_days), stride, len(_DAILY_FIELDS)))
+    for i, field in enumerate(_DAILY_FIELDS):
+        prefix[owner, position + 1, i] = values[field]
+        prefix[owner, position + 1 + n_days[owner], i] = values[field]
+    np.cumsum(prefix, axis=1, out=prefix)
+    return mean_pnl, stride, prefix.reshape(-1, len(_DAILY_FIELDS))
+
+
+def _bootstrap_shard(shard):
+    """
+    Circular block bootstrap of one shard of accounts
+
+    Each resample draws ceil(n / block_length) blocks of consecutive days
+    per account (wrapping around the end of the series) and truncates the
+    last block so every resample has exactly n days.  Blocks are at most
+    half the series long, so short series still vary between resamples.
+    Block sums come from prefix sums, so a resample costs O(blocks), not
+    O(days).  Returns an array of shape (2, len(BOOTSTRAP_METRICS),
+    accounts) holding the lower and upper quantiles.
+    """
+    n_days, daily, n_resamples, block_length, quantiles, risk_free_rate, seed = shard
+    rng = np.random.default_rng(seed)
+    mean_pnl, stride, prefix = _prefix_sums(n_days, daily)
+
+    lengths = np.clip(n_days // 2, 1, block_length)
+    n_blocks = -(-n_days // lengths)
+    owner = np.repeat(np.arange(len(n_days)), n_blocks)
+    block_lengths = lengths[owner]
+    last_blocks = np.cumsum(n_blocks) - 1
+    block_lengths[last_blocks] = n_days - (n_blocks - 1) * lengths
+    first_blocks = np.r_[0, last_blocks[:-1] + 1]
+    sizes = n_days[owner]
+    rows = owner * stride
+
+    daily_rf_rate = (1 + risk_free_rate) ** (1/365) - 1
+    mean_excess = mean_pnl - daily_rf_rate
+    samples = np.empty((len(BOOTSTRAP_METRICS), n_resamples, len(n_days)))
+    for start in range(0, n_resamples, RESAMPLE_BATCH):
+        stop = min(start + RESAMPLE_BATCH, n_resamples)
+        starts = rows + (rng.random((stop - start, len(owner))) * sizes).astype(np.int64)
+        block_sums = (
+            np.take(prefix, starts + block_lengths, axis=0) - np.take(prefix, starts, axis=0)
+        )
+        sums = np.add.reduceat(block_sums, first_blocks, axis=1)
+        centered_pnl, centered_pnl_squared, wins, trades, quantity = np.moveaxis(sums, 2, 0)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = mean_excess + centered_pnl / n_days
+            variance = (centered_pnl_squared - centered_pnl ** 2 / n_days) / (n_days - 1)
+            samples[0, start:stop] = np.where(
+                (n_days > 1) & (variance > 0), np.sqrt(365) * mean / np.sqrt(variance), 0
+            )
+            samples[1, start:stop] = wins / trades * 100
+            pnl = centered_pnl + mean_pnl * n_days
+            samples[2, start:stop] = np.where(quantity != 0, pnl / quantity * 100, 0)
+
+    return np.quantile(samples, quantiles, axis=1)
+
+
+def bootstrap_metrics(trades_df, n_resamples=1000, block_length=5, confidence=0.95, seed=0,
+                      workers=1, risk_free_rate=0.02):
+    """
+    Block-bootstrap confidence intervals for Sharpe ratio, win rate and ROI
+
+    Each account's daily series (PnL, wins, trades and quantity per
+    trading day) is resampled in blocks of block_length consecutive days,
+    which keeps short-range autocorrelation, and the metrics are recomputed
+    for every resample as calculate_metrics defines them.  Returns a
+    DataFrame indexed like calculate_metrics with '<metric>_lower' and
+    '<metric>_upper' columns for the two-sided confidence interval and
+    'trading_days'.
+
+    Accounts are processed in shards of ACCOUNTS_PER_SHARD across a
+    process pool (workers=None uses every CPU core, 1 runs in this
+    process); the same seed gives the same intervals for any workers.
+    """
+    if len(trades_df) == 0:
+        raise ValueError("No trade data available for analysis")
+
+    accounts, n_days, daily = _daily_table(trades_df)
+    tail = (1 - confidence) / 2
+    quantiles = [tail, 1 - tail]
+
+    day_offsets = np.r_[0, np.cumsum(n_days)]
+    bounds = range(0, len(accounts), ACCOUNTS_PER_SHARD)
+    seeds = np.random.SeedSequence(seed).spawn(len(bounds))
+    shards = []
+    for start, shard_seed in zip(bounds, seeds):
+        stop = min(start + ACCOUNTS_PER_SHARD, len(accounts))
+        first, last = day_offsets[start], day_offsets[stop]
+        shard_daily = {field: values[first:last] for field, values in daily.items()}
+        shards.append((
+            n_days[start:stop], shard_daily, n_resamples, block_length,
+            quantiles, risk_free_rate, shard_seed
+        ))
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(shards) < 2:
+        results = [_bootstrap_shard(shard) for shard in shards]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(shards))) as executor:
+            results = list(executor.map(_bootstrap_shard, shards))
+    lower, upper = np.concatenate(results, axis=2)
+
+    intervals = {}
+    for i, metric in enumerate(BOOTSTRAP_METRICS):
+        intervals[f'{metric}_lower'] = lower[i]
+        intervals[f'{metric}_upper'] = upper[i]
+    intervals['trading_days'] = n_days
+    return pd.DataFrame(intervals, index=pd.Index(accounts))
@@ -0,0 +1,132 @@
+import numpy as np
+import pandas as pd
+
+from .metrics import _factorize_accounts, _local_timestamps, _sort_segments
+
+# Bucket resolutions and the numpy datetime unit each one floors to
+RESOLUTIONS = {'1m': 'm', '1h': 'h', '1d': 'D'}
+
+# Sums kept per (account, bucket), in column order of EquityCube.values
+CUBE_FIELDS = ('pnl', 'quantity', 'trades', 'wins')
+
+_UNIT_SECONDS = {'m': 60, 'h': 3600, 'D': 86400}
+
+
+def _check_resolution(resolution):
+    if resolution not in RESOLUTIONS:
+        raise ValueError(
+            f"Unknown resolution '{resolution}'. "
+            f"Available resolutions: {', '.join(RESOLUTIONS)}"
+        )
+    return RESOLUTIONS[resolution]
+
+
+class EquityCube:
+    """
+    Per-account PnL, quantity, trade and win sums in time buckets
+
+    Logically an (accounts x buckets) array at 1m, 1h or 1d resolution,
+    stored sparse in CSR layout: the non-empty buckets of account i are
+    buckets[indptr[i]:indptr[i + 1]] (ascending, as integer counts of the
+    resolution's unit since the epoch) with their sums in the same rows of
+    values, one column per CUBE_FIELDS entry.  Build it once with
+    from_trades; equity curves and dense views then read from the cube
+    instead of regrouping raw trades, and resample() rolls it
+    up to a coarser resolution without touching the trades again.
+    """
+
+    def __init__(self, accounts, resolution, indptr, buckets, values):
+        self.accounts = pd.Index(accounts)
+        self.resolution = resolution
+        self.indptr = indptr
+        self.buckets = buckets
+        self.values = values
+
+    @classmethod
+    def from_trades(cls, trades_df, resolution='1h', account_index=None):
+        """Bucket every account's trades; accounts are sorted like calculate_metrics"""
+        unit = _check_resolution(resolution)
+        codes, accounts, valid = _factorize_accounts(trades_df, sort=True, account_index=account_index)
+        codes, timestamps, pnl, quantity = _sort_segments(
+            codes[valid],
+            _local_timestamps(trades_df['timestamp'])[valid],
+            trades_df['realizedProfit'].to_numpy(dtype=np.float64)[valid],
+            trades_df['quantity'].to_numpy(dtype=np.float64)[valid],
+        )
+        buckets = timestamps.astype(f'datetime64[{unit}]').view(np.int64)
+        trade_values = np.column_stack([
+            np.nan_to_num(pnl), np.nan_to_num(quantity), np.ones(len(pnl)), pnl > 0
+        ])
+        return cls._from_sorted(accounts, resolution, codes, buckets, trade_values)
+
+    @classmethod
+    def _from_sorted(cls, accounts, resolution, codes, buckets, values):
+        """Sum rows that share an (account, bucket) cell; input sorted by both"""
+        if not len(codes):
+            return cls(accounts, resolution, np.zeros(len(accounts) + 1, dtype=np.int64),
+                       buckets, values.reshape(0, len(CUBE_FIELDS)))
+        cells = np.flatnonzero(np.r_[True, (codes[1:] != codes[:-1]) | (buckets[1:] != buckets[:-1])])
+        indptr = np.r_[0, np.cumsum(np.bincount(codes[cells], minlength=len(accounts)))]
+        return cls(accounts, resolution, indptr, buckets[cells], np.add.reduceat(values, cells))
+
+    def resample(self, resolution):
+        """The same cube at an equal or coarser resolution"""
+        unit = _check_resolution(resolution)
+        current = RESOLUTIONS[self.resolution]
+        if _UNIT_SECONDS[unit] < _UNIT_SECONDS[current]:
+            raise ValueError(f"Cannot resample a {self.resolution} cube to {resolution}")
+        buckets = (
+            self.buckets.astype(f'datetime64[{current}]').astype(f'datetime64[{unit}]').view(np.int64)
+        )
+        codes = np.repeat(np.arange(len(self.accounts)), np.diff(self.indptr))
+        return self._from_sorted(self.accounts, resolution, codes, buckets, self.values)
+
+    @property
+    def nbytes(self):
+        return self.indptr.nbytes + self.buckets.nbytes + self.values.nbytes
+
+    def field(self, name):
+        """Values of one CUBE_FIELDS entry for every stored cell"""
+        return self.values[:, CUBE_FIELDS.index(name)]
+
+    def times(self):
+        """Start time of every bucket from the first to the last non-empty one"""
+        unit = RESOLUTIONS[self.resolution]
+        if not len(self.buckets):
+            return pd.DatetimeIndex([])
+        first, last = self.buckets.min(), self.buckets.max()
+        return pd.DatetimeIndex(np.arange(first, last + 1).astype(f'datetime64[{unit}]'))
+
+    def to_dense(self, field='pnl', cumulative=False):
+        """
+        The cube as a dense (accounts x times()) array of one field, with
+        empty buckets as 0; cumulative=True gives running totals, i.e. the
+        PnL equity curve of every account
+        """
+        n_buckets = len(self.times())
+        dense = np.zeros((len(self.accounts), n_buckets))
+        if n_buckets:
+            rows = np.repeat(np.arange(len(self.accounts)), np.diff(self.indptr))
+            dense[rows, self.buckets - self.buckets.min()] = self.field(field)
+        if cumulative:
+            np.cumsum(dense, axis=1, out=dense)
+        return dense
+
+    def equity_curve(self, port_id=None, field='pnl'):
+        """
+        Running total of field over the non-empty buckets of one account, or
+        of all accounts combined when port_id is None, indexed by bucket time
+        """
+        if port_id is None:
+            buckets, inverse = np.unique(self.buckets, return_inverse=True)
+            sums = np.bincount(inverse, weights=self.field(field), minlength=len(buckets))
+        else:
+            row = self.accounts.get_loc(port_id)
+            cells = slice(self.indptr[row], self.indptr[row + 1])
+            buckets, sums = self.buckets[cells], self.field(field)[cells]
+        unit = RESOLUTIONS[self.resolution]
+        return pd.Series(
+            np.cumsum(sums), index=pd.DatetimeIndex(buckets.astype(f'datetime64[{unit}]')),
+            name=field
+        )
+
@@ -0,0 +1,255 @@
+import numpy as np
+import pandas as pd
+
+from .metrics import _fees_paid, _fill_missing, _local_timestamps, _segment_starts, _sort_segments
+
+# Per-account running state and the value a new account starts from
+_INITIAL_STATE = {
+    'pnl_sum': 0.0,
+    'quantity_sum': 0.0,
+    'fee_sum': 0.0,
+    'gross_profit': 0.0,    # realizedProfit of winning trades
+    'win_positions': 0,
+    'total_positions': 0,
+    'n_days': 0,            # Welford count of daily excess returns
+    'mean': 0.0,            # Welford mean of daily excess returns
+    'm2': 0.0,              # Welford sum of squared deviations
+    'equity': 1.0,          # running product of (1 + realizedProfit)
+    'peak': np.nan,         # running max of the finite equity values
+    'min_drawdown': np.nan,
+    'last_time': np.iinfo(np.int64).min,
+    'last_day': np.iinfo(np.int64).min,     # latest trading day (days since the epoch)
+    'last_day_pnl': 0.0,    # PnL of that day so far
+}
+
+
+def _moments(slots, values):
+    """Count, mean and sum of squared deviations of values per distinct slot"""
+    unique_slots, inverse = np.unique(slots, return_inverse=True)
+    count = np.bincount(inverse)
+    mean = np.bincount(inverse, weights=values) / count
+    m2 = np.bincount(inverse, weights=(values - mean[inverse]) ** 2)
+    return unique_slots, count, mean, m2
+
+
+class MetricsState:
+    """
+    Incremental per-account metrics
+
+    Keeps running sums and counts, the PnL of each account's latest
+    trading day, a Welford mean/variance of the daily excess returns, and the running
+    equity, peak and drawdown, in fixed-size arrays per account.
+    update(new_trades) folds in a batch of fills in time proportional to
+    the batch, and metrics() returns the same frame as calculate_metrics
+    over all trades seen so far.
+
+    Each account's new fills must not be older than the fills already
+    ingested for it (equal timestamps are fine), since drawdown compounds
+    trades in time order.
+    """
+
+    def __init__(self, risk_free_rate=0.02):
+        self.risk_free_rate = risk_free_rate
+        self._daily_rf_rate = (1 + risk_free_rate) ** (1/365) - 1
+        self._slots = {}
+        self._port_ids = []
+        self._state = {
+            name: np.array([], dtype=np.asarray(initial).dtype)
+            for name, initial in _INITIAL_STATE.items()
+        }
+
+    def __len__(self):
+        return len(self._port_ids)
+
+    def _slots_for(self, port_ids):
+        """Map account ids to state slots, allocating slots for new accounts"""
+        new_ids = [port_id for port_id in port_ids if port_id not in self._slots]
+        for port_id in new_ids:
+            self._slots[port_id] = len(self._port_ids)
+            self._port_ids.append(port_id)
+        if new_ids:
+            for name, initial in _INITIAL_STATE.items():
+                self._state[name] = np.concatenate([
+                    self._state[name],
+                    np.full(len(new_ids), initial, dtype=self._state[name].dtype)
+                ])
+        return np.array([self._slots[port_id] for port_id in port_ids], dtype=np.int64)
+
+    def update(self, new_trades):
+        """Fold a batch of new trades into the state; returns self"""
+        if len(new_trades) == 0:
+            return self
+
+        codes, port_ids = pd.factorize(new_trades['Port_IDs'])
+        valid = codes >= 0
+        timestamps = _local_timestamps(new_trades['timestamp'])[valid].astype('datetime64[ns]')
+        pnl = new_trades['realizedProfit'].to_numpy(dtype=np.float64)[valid]
+        quantity = new_trades['quantity'].to_numpy(dtype=np.float64)[valid]
+        fees = _fees_paid(new_trades)[valid]
+
+        # Check ordering before touching any state
+        known = np.array([self._slots.get(port_id, -1) for port_id in port_ids], dtype=np.int64)
+        first_times = np.full(len(port_ids), np.iinfo(np.int64).max)
+        np.minimum.at(first_times, codes[valid], timestamps.view(np.int64))
+        last_times = np.full(len(port_ids), np.iinfo(np.int64).min)
+        last_times[known >= 0] = self._state['last_time'][known[known >= 0]]
+        stale = first_times < last_times
+        if stale.any():
+            raise ValueError(
+                f"Trades for Port_ID {port_ids[np.argmax(stale)]} are older than ones "
+                "already ingested; rebuild the state from the full history"
+            )
+
+        slots = self._slots_for(list(port_ids))[codes[valid]]
+        slots, timestamps, pnl, quantity, fees = _sort_segments(slots, timestamps, pnl, quantity, fees)
+        starts = _segment_starts(slots)
+        segment_slots = slots[starts]
+        state = self._state
+
+        # Running sums skip missing values, as pandas does
+        state['pnl_sum'][segment_slots] += np.add.reduceat(np.nan_to_num(pnl), starts)
+        state['quantity_sum'][segment_slots] += np.add.reduceat(np.nan_to_num(quantity), starts)
+        state['fee_sum'][segment_slots] += np.add.reduceat(np.nan_to_num(fees), starts)
+        state['gross_profit'][segment_slots] += np.add.reduceat(np.where(pnl > 0, pnl, 0), starts)
+        state['win_positions'][segment_slots] += np.add.reduceat((pnl > 0).astype(np.int64), starts)
+        state['total_positions'][segment_slots] += np.diff(np.r_[starts, len(slots)])
+        state['last_time'][segment_slots] = timestamps.view(np.int64)[np.r_[starts[1:], len(slots)] - 1]
+
+        self._update_daily(slots, timestamps, pnl)
+        self._update_drawdown(slots, starts, pnl)
+        return self
+
+    def _update_daily(self, slots, timestamps, pnl):
+        """Update account-day PnL and the Welford moments of daily returns"""
+        days = timestamps.astype('datetime64[D]').view(np.int64)
+        day_starts = np.flatnonzero(np.r_[True, (slots[1:] != slots[:-1]) | (days[1:] != days[:-1])])
+        day_pnl = np.add.reduceat(np.nan_to_num(pnl), day_starts)
+        day_slots = slots[day_starts]
+        day_values = days[day_starts]
+        state = self._state
+
+        # Fills are never older than an account's last ones, so the only
+        # day a batch can revise is the account's latest trading day
+        continues = (state['n_days'][day_slots] > 0) & (state['last_day'][day_slots] == day_values)
+        old_pnl = np.where(continues, state['last_day_pnl'][day_slots], np.nan)
+        new_pnl = np.nan_to_num(old_pnl) + day_pnl
+        last = np.r_[day_slots[1:] != day_slots[:-1], True]
+        state['last_day'][day_slots[last]] = day_values[last]
+        state['last_day_pnl'][day_slots[last]] = new_pnl[last]
+
+        # Replace the revised days: remove their old values, add the new ones
+        revised = ~np.isnan(old_pnl)
+        if revised.any():
+            self._combine(*_moments(day_slots[revised], old_pnl[revised] - self._daily_rf_rate), remove=True)
+        self._combine(*_moments(day_slots, new_pnl - self._daily_rf_rate))
+
+    def _combine(self, slots, count, mean, m2, remove=False):
+        """Merge (or remove) a batch of moments into the Welford state"""
+        state = self._state
+        n_a = state['n_days'][slots]
+        mean_a = state['mean'][slots]
+        m2_a = state['m2'][slots]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if remove:
+                n = n_a - count
+                new_mean = np.where(n > 0, (n_a * mean_a - count * mean) / n, 0.0)
+                delta = mean - new_mean
+                new_m2 = np.where(n > 0, np.maximum(m2_a - m2 - delta ** 2 * n * count / n_a, 0.0), 0.0)
+            else:
+                n = n_a + count
+                delta = mean - mean_a
+                new_mean = np.where(n_a > 0, mean_a + delta * count / n, mean)
+                new_m2 = m2_a + m2 + delta ** 2 * n_a * count / n
+
+        state['n_days'][slots] = n
+        state['mean'][slots] = new_mean
+        state['m2'][slots] = new_m2
+
+    def _update_drawdown(self, slots, starts, pnl):
+        """
+        Continue each account's equity curve through its new fills
+
+        The carried equity and peak are inserted at the head of each
+        account's segment so the running product and maximum are computed
+        in exactly the order a full recompute would use.
+        """
+        state = self._state
+        segment_slots = slots[starts]
+        lengths = np.diff(np.r_[starts, len(slots)]) + 1
+        heads = np.r_[0, np.cumsum(lengths)[:-1]]
+        total = len(slots) + len(starts)
+        is_head = np.zeros(total, dtype=bool)
+        is_head[heads] = True
+        codes = np.repeat(np.arange(len(starts)), lengths)
+
+        carried_equity = state['equity'][segment_slots]
+        growth = np.empty(total)
+        growth[is_head] = carried_equity
+        growth[~is_head] = 1 + pnl
+
+        cumulative_returns = pd.Series(growth).groupby(codes, sort=False).cumprod().to_numpy(copy=True)
+        # A NaN carried equity means the running product already broke down
+        cumulative_returns[np.repeat(np.isnan(carried_equity), lengths)] = np.nan
+
+        finite_returns = np.where(np.isfinite(cumulative_returns), cumulative_returns, np.nan)
+        finite_returns[is_head] = state['peak'][segment_slots]
+        rolling_max = pd.Series(finite_returns).groupby(codes, sort=False).cummax()
+        rolling_max = rolling_max.groupby(codes, sort=False).ffill().to_numpy()
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            drawdowns = cumulative_returns / rolling_max - 1
+        drawdowns[is_head] = np.nan
+        state['min_drawdown'][segment_slots] = np.fmin(
+            state['min_drawdown'][segment_slots], np.fmin.reduceat(drawdowns, heads)
+        )
+
+        # Carry forward the product at the last non-missing fill and the peak
+        positions = np.where(np.isnan(growth), -1, np.arange(total))
+        last_valid = np.maximum(np.maximum.reduceat(positions, heads), heads)
+        state['equity'][segment_slots] = cumulative_returns[last_valid]
+        state['peak'][segment_slots] = rolling_max[heads + lengths - 1]
+
+    def metrics(self):
+        """Metrics frame for every account seen, as calculate_metrics returns"""
+        if not self._port_ids:
+            raise ValueError("No trade data available for analysis")
+
+        state = self._state
+        n_days = state['n_days']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            roi = np.where(
+                state['quantity_sum'] != 0, state['pnl_sum'] / state['quantity_sum'] * 100, 0
+            )
+            win_rate = np.where(
+                state['total_positions'] > 0,
+                state['win_positions'] / state['total_positions'] * 100, 0
+            )
+            std = np.sqrt(state['m2'] / (n_days - 1))
+            sharpe_ratio = np.where(
+                (n_days > 1) & (std > 0), np.sqrt(365) * (state['mean'] / std), 0
+            )
+            fee_drag = np.where(
+                state['quantity_sum'] != 0, state['fee_sum'] / state['quantity_sum'] * 100, 0
+            )
+            fee_to_profit = np.where(
+                state['gross_profit'] > 0, state['fee_sum'] / state['gross_profit'], np.nan
+            )
+
+        metrics = pd.DataFrame({
+            'roi': roi,
+            'total_pnl': state['pnl_sum'],
+            'sharpe_ratio': sharpe_ratio,
+            'max_drawdown': np.abs(state['min_drawdown']) * 100,
+            'win_rate': win_rate,
+            'win_positions': state['win_positions'],
+            'total_positions': state['total_positions'],
+            'net_pnl': state['pnl_sum'] - state['fee_sum'],
+            'total_fees': state['fee_sum'],
+            'fee_drag': fee_drag,
+            'turnover': state['quantity_sum'],
+            'fee_to_profit': fee_to_profit,
+        }, index=pd.Index(self._port_ids))
+
+        # Replace any remaining NaN values with 0
+        return _fill_missing(metrics.sort_index())
@@ -20,52 +20,31 @@ def calculate_pnl(trades_df):
     pnl_by_account = trades_df.groupby('Port_IDs')['realizedProfit'].sum()
     return pnl_by_account
 
-def calculate_sharpe_ratio(trades_df, risk_free_rate=0.02):
+def calculate_sharpe_ratio(trades_df, risk_free_rate=0.02, account_index=None):
     """
     Calculate Sharpe Ratio for each account
     risk_free_rate: Annual risk-free rate (default 2%)
     """
-    # Calculate daily returns
-    trades_df['date'] = trades_df['timestamp'].dt.date
-    daily_returns = trades_df.groupby(['Port_IDs', 'date'])['realizedProfit'].sum().reset_index()
-    
-    # Calculate Sharpe Ratio by account
-    sharpe_ratios = {}
-    for port_id in daily_returns['Port_IDs'].unique():
-        port_returns = daily_returns[daily_returns['Port_IDs'] == port_id]['realizedProfit']
-        if len(port_returns) > 1:  # Need at least 2 data points
-            daily_rf_rate = (1 + risk_free_rate) ** (1/365) - 1
-            excess_returns = port_returns - daily_rf_rate
-            std = excess_returns.std()
-            if std > 0:  # Avoid division by zero
-                sharpe_ratio = np.sqrt(365) * (excess_returns.mean() / std)
-            else:
-                sharpe_ratio = 0  # Default to 0 if no variation in returns
-        else:
-            sharpe_ratio = 0  # Default to 0 if insufficient data
-        sharpe_ratios[port_id] = sharpe_ratio
-    
-    return pd.Series(sharpe_ratios)
+    codes, accounts, valid = _factorize_accounts(trades_df, sort=True, account_index=account_index)
+    codes, timestamps, pnl = _sort_segments(
+        codes[valid],
+        _local_timestamps(trades_df['timestamp'])[valid],
+        trades_df['realizedProfit'].to_numpy(dtype=np.float64)[valid],
+    )
+    return pd.Series(
+        _daily_sharpe(codes, len(accounts), timestamps, pnl, risk_free_rate),
+        index=pd.Index(accounts)
+    )
 
-def calculate_mdd(trades_df):
+def calculate_mdd(trades_df, account_index=None):
     """Calculate Maximum Drawdown for each account"""
-    mdd_by_account = {}
-    
-    for port_id in trades_df['Port_IDs'].unique():
-        port_trades = trades_df[trades_df['Port_IDs'] == port_id].sort_values('timestamp')
-        if len(port_trades) > 0:
-            cumulative_returns = (1 + port_trades['realizedProfit']).cumprod()
-            if len(cumulative_returns) > 0:
-                rolling_max = cumulative_returns.expanding().max()
-                drawdowns = cumulative_returns / rolling_max - 1
-                mdd = abs(drawdowns.min()) * 100 if len(drawdowns) > 0 else 0
-            else:
-                mdd = 0
-        else:
-            mdd = 0
-        mdd_by_account[port_id] = mdd
-    
-    return pd.Series(mdd_by_account)
+    codes, accounts, valid = _factorize_accounts(trades_df, sort=False, account_index=account_index)
+    codes, _, pnl = _sort_segments(
+        codes[valid],
+        _local_timestamps(trades_df['timestamp'])[valid],
+        trades_df['realizedProfit'].to_numpy(dtype=np.float64)[valid],
+    )
+    return pd.Series(_max_drawdown(codes, len(accounts), pnl), index=pd.Index(accounts))
 
 def calculate_win_rate(trades_df):
     """Calculate Win Rate and related metrics for each account"""
@@ -84,25 +63,223 @@ def calculate_win_rate(trades_df):
     
     return metrics_by_account
 
-def calculate_metrics(trades_df):
-    """Calculate all metrics for each account"""
+def _factorize_accounts(trades_df, sort=True, account_index=None):
+    """
+    Integer codes per trade for Port_IDs, the accounts, and a mask of valid rows
+
+    An account_index (data.accounts.AccountIndex) of an account-sorted table
+    gives the sorted codes directly, without hashing Port_IDs.
+    """
+    if account_index is not None:
+        codes = account_index.codes()
+        return codes, account_index.port_ids, np.ones(len(codes), dtype=bool)
+    codes, accounts = pd.factorize(trades_df['Port_IDs'], sort=sort)
+    return codes, accounts, codes >= 0
+
+def _local_timestamps(timestamps):
+    """Timestamps as naive datetime64 values in their own wall-clock time"""
+    if getattr(timestamps.dt, 'tz', None) is not None:
+        timestamps = timestamps.dt.tz_localize(None)
+    return timestamps.to_numpy()
+
+def _sort_segments(codes, timestamps, *columns):
+    """
+    Stable sort by (group code, timestamp) so each group becomes one
+    contiguous, time-ordered segment; tied fills keep their input order
+
+    Input that is already in that order (an account-sorted table) is
+    returned as is after one linear check.
+    """
+    if _is_segment_sorted(codes, timestamps):
+        return (codes, timestamps) + columns
+    order = np.lexsort((timestamps, codes))
+    return (codes[order], timestamps[order]) + tuple(column[order] for column in columns)
+
+def _is_segment_sorted(codes, timestamps):
+    """True if rows are ordered by group code, then timestamp"""
+    same_group = codes[1:] == codes[:-1]
+    return bool(np.all(
+        (codes[1:] > codes[:-1]) | (same_group & (timestamps[1:] >= timestamps[:-1]))
+    ))
+
+def _segment_starts(codes):
+    """Start offsets of runs of equal values in a sorted code array"""
+    return np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+
+def _daily_sharpe(codes, n_groups, timestamps, pnl, risk_free_rate=0.02):
+    """
+    Annualised Sharpe ratio of daily PnL per group, for segment-sorted input
+
+    Within a segment trades are time ordered, so each calendar day is a
+    contiguous run and daily sums are a single bincount.
+    """
+    days = timestamps.astype('datetime64[D]').view(np.int64)
+    day_starts = np.r_[True, (codes[1:] != codes[:-1]) | (days[1:] != days[:-1])]
+    day_index = np.cumsum(day_starts) - 1
+    daily_pnl = np.bincount(day_index, weights=np.nan_to_num(pnl))
+    day_codes = codes[day_starts]
+
+    daily_rf_rate = (1 + risk_free_rate) ** (1/365) - 1
+    excess_returns = daily_pnl - daily_rf_rate
+    n_days = np.bincount(day_codes, minlength=n_groups)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = np.bincount(day_codes, weights=excess_returns, minlength=n_groups) / n_days
+        variance = np.bincount(
+            day_codes, weights=(excess_returns - mean[day_codes]) ** 2, minlength=n_groups
+        ) / (n_days - 1)
+        std = np.sqrt(variance)
+        # Need at least 2 data points and some variation in returns
+        return np.where((n_days > 1) & (std > 0), np.sqrt(365) * (mean / std), 0)
+
+def _max_drawdown(codes, n_groups, pnl):
+    """
+    Maximum drawdown (%) of compounded per-trade returns per group, for
+    segment-sorted input
+    """
+    cumulative_returns = pd.Series(1 + pnl).groupby(codes, sort=False).cumprod()
+    # expanding().max() ignores non-finite values: take the running max of
+    # the finite ones and carry it forward within each segment
+    finite_returns = cumulative_returns.where(np.isfinite(cumulative_returns))
+    rolling_max = finite_returns.groupby(codes, sort=False).cummax()
+    rolling_max = rolling_max.groupby(codes, sort=False).ffill()
+    drawdowns = (cumulative_returns / rolling_max - 1).to_numpy()
+
+    starts = _segment_starts(codes)
+    max_drawdown = np.zeros(n_groups)
+    max_drawdown[codes[starts]] = np.abs(np.fmin.reduceat(drawdowns, starts)) * 100
+    return max_drawdown
+
+def _fees_paid(trades_df):
+    """
+    Commission paid per trade, as a positive amount
+
+    Exports record fees as negative amounts in the fee column; every
+    analysis output (total_fees, net_pnl = total_pnl - total_fees, and the
+    fee column of reconstruct_positions) reports them as positive costs.
+    """
+    if 'fee' not in trades_df.columns:
+        return np.zeros(len(trades_df))
+    return -trades_df['fee'].to_numpy(dtype=np.float64)
+
+def _group_metrics(codes, n_groups, timestamps, pnl, quantity, fees, risk_free_rate=0.02):
+    """
+    Single-pass metrics kernel
+
+    Trades are labelled with group codes 0..n_groups-1 (every group must
+    have at least one trade).  One stable sort by (group, timestamp) lays
+    each group out as a contiguous, time-ordered segment; every metric is
+    then a bincount or a segmented scan over those segments.
+
+    fees is the commission paid per trade (see _fees_paid).  Turnover is
+    the traded quote notional; fee drag is the ROI given up to fees, in
+    percentage points (net ROI = roi - fee_drag); fee_to_profit is fees
+    over the gross profit of winning trades, NaN for a group without wins
+    (ranked worst by analysis.ranking).
+    """
+    # Order-independent sums of columns the segment scans do not need
+    fee_sum = np.bincount(codes, weights=np.nan_to_num(fees), minlength=n_groups)
+    codes, timestamps, pnl, quantity = _sort_segments(codes, timestamps, pnl, quantity)
+
+    # Sums skip missing values, as pandas does
+    pnl_sum = np.bincount(codes, weights=np.nan_to_num(pnl), minlength=n_groups)
+    quantity_sum = np.bincount(codes, weights=np.nan_to_num(quantity), minlength=n_groups)
+    gross_profit = np.bincount(codes, weights=np.where(pnl > 0, pnl, 0), minlength=n_groups)
+    total_positions = np.bincount(codes, minlength=n_groups)
+    win_positions = np.bincount(codes, weights=pnl > 0, minlength=n_groups).astype(np.int64)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        roi = np.where(quantity_sum != 0, pnl_sum / quantity_sum * 100, 0)
+        win_rate = np.where(
+            total_positions > 0, win_positions / total_positions * 100, 0
+        )
+        fee_drag = np.where(quantity_sum != 0, fee_sum / quantity_sum * 100, 0)
+        fee_to_profit = np.where(gross_profit > 0, fee_sum / gross_profit, np.nan)
+
+    return {
+        'roi': roi,
+        'total_pnl': pnl_sum,
+        'sharpe_ratio': _daily_sharpe(codes, n_groups, timestamps, pnl, risk_free_rate),
+        'max_drawdown': _max_drawdown(codes, n_groups, pnl),
+        'win_rate': win_rate,
+        'win_positions': win_positions,
+        'total_positions': total_positions,
+        'net_pnl': pnl_sum - fee_sum,
+        'total_fees': fee_sum,
+        'fee_drag': fee_drag,
+        'turnover': quantity_sum,
+        'fee_to_profit': fee_to_profit,
+    }
+
+def _fill_missing(metrics):
+    """
+    Replace NaN metrics with 0, except fee_to_profit, which stays NaN for
+    a group without winning trades
+    """
+    return metrics.fillna({column: 0 for column in metrics.columns if column != 'fee_to_profit'})
+
+def calculate_metrics(trades_df, account_index=None):
+    """
+    Calculate all metrics for each account
+
+    account_index: optional AccountIndex of trades_df (see clean_data), which
+    skips factorizing Port_IDs
+    """
     # Ensure the DataFrame is not empty
     if len(trades_df) == 0:
         raise ValueError("No trade data available for analysis")
-        
-    metrics = pd.DataFrame({
-        'roi': calculate_roi(trades_df),
-        'total_pnl': calculate_pnl(trades_df),
-        'sharpe_ratio': calculate_sharpe_ratio(trades_df),
-        'max_drawdown': calculate_mdd(trades_df)
-    })
-    
-    win_metrics = calculate_win_rate(trades_df)
-    metrics['win_rate'] = win_metrics['win_rate']
-    metrics['win_positions'] = win_metrics['realizedProfit']
-    metrics['total_positions'] = win_metrics['total_positions']
-    
+
+    # Factorize the accounts once; every metric is computed from the codes
+    codes, accounts, valid = _factorize_accounts(trades_df, sort=True, account_index=account_index)
+    metrics = pd.DataFrame(
+        _group_metrics(
+            codes[valid],
+            len(accounts),
+            _local_timestamps(trades_df['timestamp'])[valid],
+            trades_df['realizedProfit'].to_numpy(dtype=np.float64)[valid],
+            trades_df['quantity'].to_numpy(dtype=np.float64)[valid],
+            _fees_paid(trades_df)[valid],
+        ),
+        index=pd.Index(accounts)
+    )
+
     # Replace any remaining NaN values with 0
-    metrics = metrics.fillna(0)
-    
-    return metrics
\ No newline at end of file
+    metrics = _fill_missing(metrics)
+
+    return metrics
+
+def calculate_symbol_metrics(trades_df, risk_free_rate=0.02, account_index=None):
+    """
+    Calculate all metrics for each (account, symbol) pair that has trades
+
+    Each trade gets one group code for its (Port_IDs, symbol) pair and the
+    same kernel as calculate_metrics runs over those groups, so the result
+    has one row per traded pair rather than a dense accounts x symbols
+    grid.  Rows are indexed by a (Port_IDs, symbol) MultiIndex, sorted.
+    """
+    if len(trades_df) == 0:
+        raise ValueError("No trade data available for analysis")
+
+    account_codes, accounts, valid = _factorize_accounts(
+        trades_df, sort=True, account_index=account_index
+    )
+    symbol_codes, symbols = pd.factorize(trades_df['symbol'], sort=True)
+    valid = valid & (symbol_codes >= 0)
+    pair_keys = account_codes[valid].astype(np.int64) * len(symbols) + symbol_codes[valid]
+    codes, pairs = pd.factorize(pair_keys, sort=True)
+
+    metrics = pd.DataFrame(
+        _group_metrics(
+            codes,
+            len(pairs),
+            _local_timestamps(trades_df['timestamp'])[valid],
+            trades_df['realizedProfit'].to_numpy(dtype=np.float64)[valid],
+            trades_df['quantity'].to_numpy(dtype=np.float64)[valid],
+            _fees_paid(trades_df)[valid],
+            risk_free_rate,
+        ),
+        index=pd.MultiIndex.from_arrays(
+            [np.asarray(accounts)[pairs // len(symbols)], np.asarray(symbols)[pairs % len(symbols)]],
+            names=['Port_IDs', 'symbol']
+        )
+    )
+    return _fill_missing(metrics)
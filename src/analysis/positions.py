@@ -0,0 +1,183 @@
+import numpy as np
+import pandas as pd
+
+from .metrics import _fees_paid, _local_timestamps, _sort_segments
+
+# A net quantity within this fraction of the largest fill so far in the
+# group counts as flat, which absorbs floating-point drift in the sums
+FLAT_TOLERANCE = 1e-9
+
+
+def _codes(values):
+    """Integer codes (sorted order) and uniques for one key column"""
+    return pd.factorize(values, sort=True)
+
+
+def _side_signs(side):
+    """+1 for BUY, -1 for SELL and 0 for anything else, per fill"""
+    codes, uniques = pd.factorize(side)
+    signs = np.array([
+        {'BUY': 1, 'SELL': -1}.get(str(value).upper(), 0) for value in uniques
+    ] + [0], dtype=np.int8)
+    return signs[codes]
+
+
+def _is_flat(net, scale):
+    return np.abs(net) <= FLAT_TOLERANCE * scale
+
+
+def _empty_positions(accounts, symbols, position_sides, timestamps, has_fee):
+    """The columns of reconstruct_positions, with their dtypes, and no rows"""
+    none = np.array([], dtype=np.intp)
+    times = timestamps[:0]
+    positions = pd.DataFrame({
+        'Port_IDs': accounts[none],
+        'symbol': symbols[none],
+        'positionSide': position_sides[none],
+        'direction': np.array([], dtype='<U5'),
+        'open_time': times,
+        'close_time': times,
+        'holding_time': times - times,
+        'quantity': np.array([], dtype=np.float64),
+        'avg_entry_price': np.array([], dtype=np.float64),
+        'avg_exit_price': np.array([], dtype=np.float64),
+        'realized_pnl': np.array([], dtype=np.float64),
+    })
+    if has_fee:
+        positions['fee'] = np.array([], dtype=np.float64)
+    positions['n_fills'] = np.array([], dtype=np.int64)
+    positions['is_closed'] = np.array([], dtype=bool)
+    return positions
+
+
+def reconstruct_positions(trades_df):
+    """
+    Rebuild round-trip positions from fills
+
+    Fills are walked per (Port_IDs, symbol, positionSide) in time order
+    and BUY/SELL quantities (qty, in the base asset) are summed into a
+    running net position.  A position opens on the first fill from flat
+    and closes on the fill that brings the net back to flat; a fill that
+    flips the net from long to short (or back) closes one position and
+    opens the next, with its quantity and fee split between the two.  The
+    whole walk is a grouped cumulative sum plus segment reductions, with no
+    per-fill Python loop.
+
+    History is assumed to start flat, so a position opened before the
+    first fill in the data shows up with its closing fills as entries.
+
+    Returns one row per position, ordered by account, symbol, positionSide
+    and open time, with columns Port_IDs, symbol, positionSide, direction
+    ('LONG' or 'SHORT'), open_time, close_time, holding_time, quantity
+    (total entry size), avg_entry_price, avg_exit_price, realized_pnl,
+    fee (if the fills have one; commission paid as a positive amount, like
+    total_fees in calculate_metrics), n_fills and is_closed.  Positions
+    still open at the end of the data have no close_time or holding_time.
+    With no valid fills the result has these columns and no rows.
+    """
+    if 'positionSide' in trades_df.columns:
+        position_side = trades_df['positionSide']
+    else:
+        position_side = pd.Series('BOTH', index=trades_df.index)
+
+    account_codes, accounts = _codes(trades_df['Port_IDs'])
+    symbol_codes, symbols = _codes(trades_df['symbol'])
+    side_codes, position_sides = _codes(position_side)
+    signs = _side_signs(trades_df['side'])
+    qty = trades_df['qty'].to_numpy(dtype=np.float64)
+    valid = (
+        (account_codes >= 0) & (symbol_codes >= 0) & (side_codes >= 0)
+        & (signs != 0) & np.isfinite(qty)
+    )
+    has_fee = 'fee' in trades_df.columns
+    if not valid.any():
+        return _empty_positions(
+            accounts, symbols, position_sides, _local_timestamps(trades_df['timestamp']), has_fee
+        )
+
+    # One code per (account, symbol, positionSide), in sorted key order
+    keys = (
+        (account_codes.astype(np.int64) * len(symbols) + symbol_codes) * len(position_sides)
+        + side_codes
+    )
+    group_codes, _ = pd.factorize(keys[valid], sort=True)
+
+    columns = {
+        'signed': signs[valid] * np.abs(qty[valid]),
+        'price': trades_df['price'].to_numpy(dtype=np.float64)[valid],
+        'pnl': trades_df['realizedProfit'].to_numpy(dtype=np.float64)[valid],
+        'account': account_codes[valid],
+        'symbol': symbol_codes[valid],
+        'position_side': side_codes[valid],
+    }
+    if has_fee:
+        columns['fee'] = _fees_paid(trades_df)[valid]
+    group_codes, timestamps, *sorted_columns = _sort_segments(
+        group_codes, _local_timestamps(trades_df['timestamp'])[valid], *columns.values()
+    )
+    fills = dict(zip(columns, sorted_columns))
+    signed = fills['signed']
+
+    # Running net position and its value before each fill
+    grouped = pd.Series(signed).groupby(group_codes, sort=False)
+    net = grouped.cumsum().to_numpy()
+    scale = pd.Series(np.abs(signed)).groupby(group_codes, sort=False).cummax().to_numpy()
+    group_start = np.r_[True, group_codes[1:] != group_codes[:-1]]
+    net_before = np.where(group_start, 0.0, np.r_[0.0, net[:-1]])
+    flat_before = _is_flat(net_before, scale)
+    flat_after = _is_flat(net, scale)
+    flip = ~flat_before & ~flat_after & (np.sign(net_before) != np.sign(net))
+
+    # Split every flipping fill into a closing part and an opening part
+    rows = np.repeat(np.arange(len(signed)), np.where(flip, 2, 1))
+    second = np.r_[False, rows[1:] == rows[:-1]]
+    flip_close = flip[rows] & ~second
+    part_qty = np.where(
+        flip_close, np.abs(net_before[rows]),
+        np.where(second, np.abs(net[rows]), np.abs(signed[rows]))
+    )
+    part_signed = np.sign(signed[rows]) * part_qty
+    with np.errstate(divide='ignore', invalid='ignore'):
+        share = np.where(flip[rows], part_qty / np.abs(signed[rows]), 1.0)
+
+    opens = flat_before[rows] | second
+    closes = flat_after[rows] | flip_close
+    starts = np.flatnonzero(opens)
+    lasts = np.r_[starts[1:], len(rows)] - 1
+    position = np.cumsum(opens) - 1
+
+    direction = np.sign(part_signed[starts])
+    entry = np.sign(part_signed) == direction[position]
+    price = fills['price'][rows]
+    entry_qty = np.add.reduceat(np.where(entry, part_qty, 0.0), starts)
+    exit_qty = np.add.reduceat(np.where(entry, 0.0, part_qty), starts)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        avg_entry = np.add.reduceat(np.where(entry, part_qty * price, 0.0), starts) / entry_qty
+        avg_exit = np.add.reduceat(np.where(entry, 0.0, part_qty * price), starts) / exit_qty
+
+    is_closed = closes[lasts]
+    fill_times = timestamps[rows]
+    open_time = fill_times[starts]
+    close_time = np.where(is_closed, fill_times[lasts], np.datetime64('NaT'))
+    first_fill = rows[starts]
+
+    positions = pd.DataFrame({
+        'Port_IDs': accounts[fills['account'][first_fill]],
+        'symbol': symbols[fills['symbol'][first_fill]],
+        'positionSide': position_sides[fills['position_side'][first_fill]],
+        'direction': np.where(direction > 0, 'LONG', 'SHORT'),
+        'open_time': open_time,
+        'close_time': close_time,
+        'holding_time': close_time - open_time,
+        'quantity': entry_qty,
+        'avg_entry_price': avg_entry,
+        'avg_exit_price': avg_exit,
+        'realized_pnl': np.add.reduceat(
+            np.where(second, 0.0, np.nan_to_num(fills['pnl'][rows])), starts
+        ),
+    })
+    if has_fee:
+        positions['fee'] = np.add.reduceat(np.nan_to_num(fills['fee'][rows]) * share, starts)
+    positions['n_fills'] = np.diff(np.r_[starts, len(rows)])
+    positions['is_closed'] = is_closed
+    return positions
@@ -1,93 +1,319 @@
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import MinMaxScaler
 
-def normalize_metrics(metrics_df):
-    """
-    Normalize metrics to a 0-1 scale for fair comparison
-    """
-    # Create a copy to avoid modifying the original
-    df = metrics_df.copy()
-    
-    # Ensure all values are finite
-    df = df.replace([np.inf, -np.inf], 0)
-    df = df.fillna(0)
-    
-    # Columns to normalize
-    cols_to_normalize = ['roi', 'total_pnl', 'sharpe_ratio', 'win_rate']
-    
-    # Handle max_drawdown separately (lower is better)
-    mdd = df['max_drawdown']
-    if mdd.max() != mdd.min():
-        normalized_mdd = 1 - (mdd - mdd.min()) / (mdd.max() - mdd.min())
-    else:
-        normalized_mdd = pd.Series(1, index=mdd.index)  # All accounts have same MDD
-    
-    # Initialize normalized DataFrame
-    normalized_data = pd.DataFrame(index=df.index)
-    
-    # Normalize each column separately to handle edge cases
-    for col in cols_to_normalize:
-        values = df[col]
-        if values.max() != values.min():
-            normalized_data[col] = (values - values.min()) / (values.max() - values.min())
-        else:
-            normalized_data[col] = pd.Series(1 if values.iloc[0] > 0 else 0, index=values.index)
-    
-    # Add normalized MDD
-    normalized_data['max_drawdown'] = normalized_mdd
-    
-    return normalized_data
+# Ranking metrics and whether a higher value is better (1) or worse (-1).
+# turnover is reported by calculate_metrics but not ranked: trading more
+# is not a sign of a better trader.
+METRIC_DIRECTIONS = {
+    'roi': 1,
+    'total_pnl': 1,
+    'sharpe_ratio': 1,
+    'max_drawdown': -1,
+    'win_rate': 1,
+    'net_pnl': 1,
+    'fee_drag': -1,
+    'fee_to_profit': -1
+}
+RANKING_METRICS = list(METRIC_DIRECTIONS)
 
-def get_feature_importance():
-    """
-    Define feature importance weights for ranking
-    """
-    weights = {
+# Metrics whose missing values (NaN: fee_to_profit of an account without
+# wins) score worst; other non-finite values count as 0
+WORST_IF_MISSING = ('fee_to_profit',)
+
+# Named weight profiles; each maps ranking metrics to weights summing to 1
+WEIGHT_PROFILES = {
+    'balanced': {
         'roi': 0.25,           # Return on Investment
         'total_pnl': 0.20,     # Total Profit and Loss
         'sharpe_ratio': 0.20,  # Risk-adjusted returns
         'max_drawdown': 0.15,  # Risk measure
         'win_rate': 0.20       # Consistency measure
+    },
+    'conservative': {
+        'roi': 0.10,
+        'total_pnl': 0.10,
+        'sharpe_ratio': 0.30,
+        'max_drawdown': 0.30,
+        'win_rate': 0.20
+    },
+    'aggressive': {
+        'roi': 0.35,
+        'total_pnl': 0.35,
+        'sharpe_ratio': 0.10,
+        'max_drawdown': 0.05,
+        'win_rate': 0.15
+    },
+    'cost-aware': {
+        'roi': 0.15,
+        'net_pnl': 0.25,       # Profit after fees
+        'sharpe_ratio': 0.20,
+        'max_drawdown': 0.15,
+        'win_rate': 0.10,
+        'fee_drag': 0.15       # ROI lost to fees
     }
-    return weights
+}
 
-def rank_accounts(metrics_df, top_n=20):
+def metric_matrix(metrics_df):
+    """
+    Normalized ranking metrics as a contiguous (accounts x metrics) array
+
+    Columns follow RANKING_METRICS.  Each column is min-max scaled to 0-1,
+    flipped for metrics where lower is better; a constant column becomes
+    1 (or 0 for a non-positive constant where higher is better).
+    Non-finite values are treated as 0, except in WORST_IF_MISSING
+    metrics, where they score 0, the worst.  Metrics missing from
+    metrics_df, such as the fee metrics in frames from older versions, get
+    a column of zeros; scoring with a nonzero weight on one raises
+    ValueError.
+    """
+    present = [metric for metric in RANKING_METRICS if metric in metrics_df.columns]
+    values = np.zeros((len(metrics_df), len(RANKING_METRICS)))
+    values[:, [RANKING_METRICS.index(metric) for metric in present]] = (
+        metrics_df[present].to_numpy(dtype=np.float64)
+    )
+
+    directions = np.array([METRIC_DIRECTIONS[metric] for metric in RANKING_METRICS])
+    if not len(values):
+        return np.ascontiguousarray(values)
+
+    # Ensure all values are finite; WORST_IF_MISSING columns are scaled
+    # over their finite values and their gaps score worst below
+    finite = np.isfinite(values)
+    worst = ~finite & np.isin(RANKING_METRICS, WORST_IF_MISSING)
+    values[~finite & ~worst] = 0
+    fill = np.where(finite, values, np.inf).min(axis=0)
+    values = np.where(worst, np.where(np.isfinite(fill), fill, 0), values)
+
+    minimum = values.min(axis=0)
+    span = values.max(axis=0) - minimum
+    varying = span != 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        normalized = (values - minimum) / span
+    normalized[:, directions < 0] = 1 - normalized[:, directions < 0]
+
+    # Constant columns
+    constant = np.where(directions < 0, 1.0, (values[0] > 0).astype(np.float64))
+    normalized[:, ~varying] = constant[~varying]
+    normalized[worst] = 0
+    return np.ascontiguousarray(normalized)
+
+def normalize_metrics(metrics_df):
+    """
+    Normalize metrics to a 0-1 scale for fair comparison
+    """
+    return pd.DataFrame(metric_matrix(metrics_df), index=metrics_df.index, columns=RANKING_METRICS)
+
+def get_feature_importance(profile='balanced'):
+    """
+    Feature importance weights for ranking, from a named profile
+    """
+    if profile not in WEIGHT_PROFILES:
+        raise ValueError(
+            f"Unknown weight profile '{profile}'. "
+            f"Available profiles: {', '.join(WEIGHT_PROFILES)}"
+        )
+    return dict(WEIGHT_PROFILES[profile])
+
+def weight_vector(weights='balanced'):
+    """
+    Weights as an array in RANKING_METRICS order
+
+    weights is a profile name or a dict of metric weights; metrics missing
+    from the dict get weight 0.
+    """
+    if isinstance(weights, str):
+        weights = get_feature_importance(weights)
+    unknown = set(weights) - set(RANKING_METRICS)
+    if unknown:
+        raise ValueError(
+            f"Unknown ranking metrics: {', '.join(sorted(unknown))}. "
+            f"Ranking metrics are: {', '.join(RANKING_METRICS)}"
+        )
+    return np.array([weights.get(metric, 0.0) for metric in RANKING_METRICS], dtype=np.float64)
+
+def _check_weighted_metrics(metrics_df, weights):
+    """
+    ValueError if metrics_df lacks a metric with a nonzero weight; weights
+    is a weight_vector or a (metrics x profiles) array of them
+    """
+    weighted = (np.reshape(weights, (len(RANKING_METRICS), -1)) != 0).any(axis=1)
+    missing = [
+        metric for metric, used in zip(RANKING_METRICS, weighted)
+        if used and metric not in metrics_df.columns
+    ]
+    if missing:
+        raise ValueError(
+            f"Metrics have no {', '.join(missing)} column, which the ranking weights use"
+        )
+
+def score_profiles(metrics_df, profiles=None, matrix=None):
+    """
+    Score every account under several weight profiles at once
+
+    profiles is a list of profile names, or a dict mapping labels to
+    profile names or weight dicts (default: every named profile whose
+    metrics metrics_df has).  Pass a precomputed metric_matrix as matrix to
+    skip normalization.  Returns an (accounts x profiles) DataFrame from a
+    single matrix multiply.
+    """
+    if profiles is None:
+        profiles = [
+            profile for profile, weights in WEIGHT_PROFILES.items()
+            if all(metric in metrics_df.columns for metric in weights)
+        ]
+    if not isinstance(profiles, dict):
+        profiles = {profile: profile for profile in profiles}
+    if matrix is None:
+        matrix = metric_matrix(metrics_df)
+
+    weights = np.column_stack([weight_vector(weights) for weights in profiles.values()])
+    _check_weighted_metrics(metrics_df, weights)
+    return pd.DataFrame(matrix @ weights, index=metrics_df.index, columns=list(profiles))
+
+def sample_weights(weights='balanced', n_samples=1000, concentration=50.0, seed=0):
+    """
+    Dirichlet samples of weight vectors around a profile
+
+    Returns an (n_samples x metrics) array in RANKING_METRICS order whose
+    rows have the same total as the profile.  Higher concentration keeps
+    the samples closer to the profile; metrics weighted 0 stay at 0.
+    """
+    base = weight_vector(weights)
+    active = base > 0
+    rng = np.random.default_rng(seed)
+    samples = np.zeros((n_samples, len(base)))
+    samples[:, active] = rng.dirichlet(
+        concentration * base[active] / base[active].sum(), n_samples
+    ) * base.sum()
+    return samples
+
+def sweep_ranks(matrix, weight_samples, batch_size=256):
+    """
+    Rank every account under every sampled weight vector
+
+    matrix is a metric_matrix and weight_samples an (n_samples x metrics)
+    array.  Scores are computed a batch of samples at a time with one
+    matrix multiply and ranked with one argsort per batch (ties keep
+    account order, as in score_accounts).  Returns an int32
+    (accounts x n_samples) array of ranks, 1 = best.
+    """
+    n_accounts = len(matrix)
+    n_samples = len(weight_samples)
+    ranks = np.empty((n_accounts, n_samples), dtype=np.int32)
+    positions = np.arange(1, n_accounts + 1, dtype=np.int32)[:, None]
+    for start in range(0, n_samples, batch_size):
+        stop = min(start + batch_size, n_samples)
+        scores = matrix @ weight_samples[start:stop].T
+        order = np.argsort(-scores, axis=0, kind='stable')
+        np.put_along_axis(ranks[:, start:stop], order, positions, axis=0)
+    return ranks
+
+def weight_sensitivity(metrics_df, weights='balanced', n_samples=1000, concentration=50.0,
+                       top_n=20, seed=0, matrix=None):
+    """
+    Rank stability of every account under perturbed weights
+
+    Samples n_samples weight vectors around the given profile (see
+    sample_weights), ranks all accounts under each, and summarizes each
+    account's rank distribution along with the probability that it makes
+    the top_n.  Returns a DataFrame indexed like metrics_df.
+    """
+    if matrix is None:
+        matrix = metric_matrix(metrics_df)
+    ranks = sweep_ranks(matrix, sample_weights(weights, n_samples, concentration, seed))
+    base_ranks = score_accounts(metrics_df, weights, matrix)['Rank']
+    p5, median, p95 = np.percentile(ranks, [5, 50, 95], axis=1)
+
+    return pd.DataFrame({
+        'Rank': base_ranks.to_numpy(),
+        'Mean Rank': ranks.mean(axis=1),
+        'Rank Std': ranks.std(axis=1),
+        'Best Rank': ranks.min(axis=1),
+        'P5 Rank': p5,
+        'Median Rank': median,
+        'P95 Rank': p95,
+        'Worst Rank': ranks.max(axis=1),
+        f'Top {top_n} Probability': (ranks <= top_n).mean(axis=1)
+    }, index=metrics_df.index)
+
+def _account_scores(metrics_df, weights='balanced', matrix=None):
+    """Weighted score of every account, as a float array in index order"""
+    weights = weight_vector(weights)
+    _check_weighted_metrics(metrics_df, weights)
+    if matrix is None:
+        matrix = metric_matrix(metrics_df)
+    return matrix @ weights
+
+def _top_positions(scores, top_n):
+    """
+    Positions of the top_n scores, best first
+
+    Uses a partial partition instead of a full sort; ties are broken by
+    position, matching the ranks from score_accounts.
+    """
+    if top_n >= len(scores):
+        return np.argsort(-scores, kind='stable')
+    if top_n <= 0:
+        return np.array([], dtype=np.intp)
+
+    cutoff = scores[np.argpartition(-scores, top_n - 1)[top_n - 1]]
+    above = np.flatnonzero(scores > cutoff)
+    tied = np.flatnonzero(scores == cutoff)[:top_n - len(above)]
+    top = np.concatenate([above, tied])
+    return top[np.argsort(-scores[top], kind='stable')]
+
+def score_accounts(metrics_df, weights='balanced', matrix=None):
+    """
+    Score and rank every account
+
+    weights is a profile name or a dict of metric weights, and matrix an
+    optional precomputed metric_matrix.  Returns a DataFrame indexed like
+    metrics_df with 'Score' and 'Rank' (1 = best; ties keep index order),
+    so any account's rank is a single lookup:
+    score_accounts(metrics).at[port_id, 'Rank'].
+    """
+    scores = _account_scores(metrics_df, weights, matrix)
+    ranks = np.empty(len(scores), dtype=np.int64)
+    ranks[np.argsort(-scores, kind='stable')] = np.arange(1, len(scores) + 1)
+    return pd.DataFrame({'Score': scores, 'Rank': ranks}, index=metrics_df.index)
+
+def rank_accounts(metrics_df, top_n=20, scores=None, weights='balanced'):
     """
     Rank accounts based on normalized metrics and weights
+
+    Returns the top_n accounts under the given weight profile (name or
+    dict).  Pass the output of score_accounts as scores to reuse it
+    instead of scoring the accounts again; weights is then ignored.
     """
-    # Normalize metrics
-    normalized_metrics = normalize_metrics(metrics_df)
-    
-    # Get feature weights
-    weights = get_feature_importance()
-    
-    # Calculate weighted scores
-    weighted_scores = pd.Series(0, index=metrics_df.index)
-    for metric, weight in weights.items():
-        weighted_scores += normalized_metrics[metric] * weight
+    if scores is None:
+        score_values = _account_scores(metrics_df, weights)
+        top = _top_positions(score_values, top_n)
+    else:
+        score_values = scores['Score'].to_numpy()
+        ranks = scores['Rank'].to_numpy()
+        top = np.flatnonzero(ranks <= top_n)
+        top = top[np.argsort(ranks[top])]
+    top_metrics = metrics_df.iloc[top]
     
-    # Create ranking DataFrame
+    # Create ranking DataFrame; the fee columns only if the metrics have them
+    columns = {
+        'Rank': np.arange(1, len(top) + 1),
+        'Port_IDs': top_metrics.index,
+        'Score': score_values[top],
+        'ROI (%)': top_metrics['roi'].round(2).to_numpy(),
+        'Total PnL': top_metrics['total_pnl'].round(2).to_numpy(),
+    }
+    if 'net_pnl' in top_metrics.columns:
+        columns['Net PnL'] = top_metrics['net_pnl'].round(2).to_numpy()
+    if 'fee_drag' in top_metrics.columns:
+        columns['Fee Drag (%)'] = top_metrics['fee_drag'].round(4).to_numpy()
     rankings = pd.DataFrame({
-        'Port_IDs': metrics_df.index,
-        'Score': weighted_scores,
-        'ROI (%)': metrics_df['roi'].round(2),
-        'Total PnL': metrics_df['total_pnl'].round(2),
-        'Sharpe Ratio': metrics_df['sharpe_ratio'].round(2),
-        'Max Drawdown (%)': metrics_df['max_drawdown'].round(2),
-        'Win Rate (%)': metrics_df['win_rate'].round(2),
-        'Win Positions': metrics_df['win_positions'],
-        'Total Positions': metrics_df['total_positions']
-    })
-    
-    # Sort by score and get top N
-    rankings = rankings.sort_values('Score', ascending=False).head(top_n)
-    rankings['Rank'] = range(1, len(rankings) + 1)
-    
-    # Reorder columns
-    column_order = ['Rank', 'Port_IDs', 'Score', 'ROI (%)', 'Total PnL', 
-                   'Sharpe Ratio', 'Max Drawdown (%)', 'Win Rate (%)',
-                   'Win Positions', 'Total Positions']
-    rankings = rankings[column_order]
+        **columns,
+        'Sharpe Ratio': top_metrics['sharpe_ratio'].round(2).to_numpy(),
+        'Max Drawdown (%)': top_metrics['max_drawdown'].round(2).to_numpy(),
+        'Win Rate (%)': top_metrics['win_rate'].round(2).to_numpy(),
+        'Win Positions': top_metrics['win_positions'].to_numpy(),
+        'Total Positions': top_metrics['total_positions'].to_numpy()
+    }, index=top_metrics.index)
     
-    return rankings
\ No newline at end of file
+    return rankings
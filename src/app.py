@@ -8,10 +8,111 @@ from data.loader import (
     get_account_summary,
     get_trade_summary
 )
-from analysis.metrics import calculate_metrics
-from analysis.ranking import rank_accounts, get_feature_importance
+from data.accounts import AccountIndex
+from data.cache import TradeCache, content_key
+from data.reporting import StreamlitReporter, set_reporter
+from analysis.equity import RESOLUTIONS, EquityCube
+from analysis.metrics import calculate_metrics, calculate_symbol_metrics
+from analysis.ranking import (
+    WEIGHT_PROFILES,
+    get_feature_importance,
+    metric_matrix,
+    rank_accounts,
+    score_accounts,
+    weight_sensitivity
+)
 import numpy as np
 
+# Show loader messages in the page
+set_reporter(StreamlitReporter())
+
+# On-disk cache of cleaned trade tables, keyed by upload content
+TRADE_CACHE = TradeCache()
+
+# Uploads whose pipeline results are kept in memory across reruns
+PIPELINE_CACHE_ENTRIES = 4
+
+
+def get_upload_key(uploaded_file):
+    """Content hash of an upload, computed once per uploaded file"""
+    upload_keys = st.session_state.setdefault('upload_keys', {})
+    if uploaded_file.file_id not in upload_keys:
+        upload_keys[uploaded_file.file_id] = content_key(uploaded_file.getvalue(), 'cleaned')
+    return upload_keys[uploaded_file.file_id]
+
+
+# Pipeline stages are memoised on the upload key plus their parameters, so
+# widget interactions rerun the script without re-parsing.  Arguments with a
+# leading underscore are not hashed by Streamlit; the results are shared
+# between reruns and must not be modified in place (the cleaned table is a
+# read-only memory map of the TradeCache entry).
+@st.cache_resource(max_entries=PIPELINE_CACHE_ENTRIES, show_spinner=False)
+def get_cleaned_data(upload_key, _uploaded_file):
+    """Load and clean an upload, reusing the on-disk cache when possible"""
+    cleaned_data = TRADE_CACHE.get(upload_key)
+    if cleaned_data is None:
+        # Load and process data
+        data = load_data(_uploaded_file)
+        if data is None:
+            return None
+        cleaned_data = clean_data(data)
+        TRADE_CACHE.put(upload_key, cleaned_data)
+        # Keep the memory-mapped copy so the parsed one can be freed
+        mapped_data = TRADE_CACHE.get(upload_key)
+        if mapped_data is not None:
+            cleaned_data = mapped_data
+    return cleaned_data
+
+
+@st.cache_resource(max_entries=PIPELINE_CACHE_ENTRIES, show_spinner=False)
+def get_account_index(upload_key, _cleaned_data):
+    return AccountIndex.from_sorted(_cleaned_data['Port_IDs'])
+
+
+@st.cache_resource(max_entries=PIPELINE_CACHE_ENTRIES, show_spinner=False)
+def get_metrics(upload_key, _cleaned_data, _account_index):
+    return calculate_metrics(_cleaned_data, account_index=_account_index)
+
+
+@st.cache_resource(max_entries=PIPELINE_CACHE_ENTRIES, show_spinner=False)
+def get_symbol_metrics(upload_key, _cleaned_data, _account_index):
+    return calculate_symbol_metrics(_cleaned_data, account_index=_account_index)
+
+
+@st.cache_resource(max_entries=PIPELINE_CACHE_ENTRIES * len(RESOLUTIONS), show_spinner=False)
+def get_equity_cube(upload_key, resolution, _cleaned_data, _account_index):
+    return EquityCube.from_trades(_cleaned_data, resolution, account_index=_account_index)
+
+
+@st.cache_resource(max_entries=PIPELINE_CACHE_ENTRIES, show_spinner=False)
+def get_metric_matrix(upload_key, _metrics):
+    return metric_matrix(_metrics)
+
+
+# Scores and rankings are cached per weight profile; switching profiles
+# reuses the normalized metric matrix
+@st.cache_resource(max_entries=PIPELINE_CACHE_ENTRIES * len(WEIGHT_PROFILES), show_spinner=False)
+def get_account_scores(upload_key, profile, _metrics, _matrix):
+    return score_accounts(_metrics, weights=profile, matrix=_matrix)
+
+
+@st.cache_resource(max_entries=PIPELINE_CACHE_ENTRIES * len(WEIGHT_PROFILES), show_spinner=False)
+def get_rankings(upload_key, profile, top_n, _metrics, _account_scores):
+    return rank_accounts(_metrics, top_n=top_n, scores=_account_scores)
+
+
+@st.cache_resource(max_entries=PIPELINE_CACHE_ENTRIES * len(WEIGHT_PROFILES), show_spinner=False)
+def get_rank_stability(upload_key, profile, n_samples, concentration, _metrics, _matrix):
+    return weight_sensitivity(
+        _metrics, weights=profile, n_samples=n_samples, concentration=concentration, matrix=_matrix
+    )
+
+
+@st.cache_resource(max_entries=PIPELINE_CACHE_ENTRIES, show_spinner=False)
+def get_trade_breakdown(upload_key, _cleaned_data):
+    return get_trade_summary(_cleaned_data)
+
+
 # Set page config and theme
 st.set_page_config(
     page_title="Binance Trade Analyzer",
@@ -181,12 +282,24 @@ uploaded_file = st.file_uploader(
 
 if uploaded_file is not None:
     with st.spinner('Processing trade data...'):
-        # Load and process data
-        data = load_data(uploaded_file)
-        if data is not None:
-            cleaned_data = clean_data(data)
-            metrics = calculate_metrics(cleaned_data)
-            rankings = rank_accounts(metrics)
+        upload_key = get_upload_key(uploaded_file)
+        cleaned_data = get_cleaned_data(upload_key, uploaded_file)
+        if cleaned_data is not None:
+            account_index = get_account_index(upload_key, cleaned_data)
+            metrics = get_metrics(upload_key, cleaned_data, account_index)
+            
+            # Weight profile used for scores and rankings
+            st.sidebar.header("⚖️ Ranking Profile")
+            profile = st.sidebar.selectbox(
+                "Weight Profile",
+                list(WEIGHT_PROFILES),
+                format_func=str.capitalize,
+                help="Balanced weighs all metrics; conservative favours risk-adjusted returns and low drawdown; aggressive favours raw returns; cost-aware ranks on profit after fees"
+            )
+            account_scores = get_account_scores(
+                upload_key, profile, metrics, get_metric_matrix(upload_key, metrics)
+            )
+            rankings = get_rankings(upload_key, profile, 20, metrics, account_scores)
             
             # Account Selector
             st.sidebar.header("🔍 Account Filter")
@@ -234,7 +347,7 @@ if uploaded_file is not None:
             # Filter data based on selection
             if selected_account != "All Accounts":
                 account_metrics = metrics.loc[[selected_account]]
-                account_data = cleaned_data[cleaned_data['Port_IDs'] == selected_account]
+                account_data = account_index.rows(cleaned_data, selected_account)
                 account_rankings = rankings[rankings['Port_IDs'] == selected_account]
             else:
                 account_metrics = metrics
@@ -283,62 +396,17 @@ if uploaded_file is not None:
 
             # If a specific account is selected, show its rank
             if selected_account != "All Accounts":
-                # Get account details safely
-                account_rank_info = rankings[rankings['Port_IDs'] == selected_account]
-                
                 # Get account metrics regardless of rank
                 account_metrics_display = metrics.loc[selected_account]
                 
                 # Determine rank status
-                if not account_rank_info.empty:
-                    rank_display = f"{account_rank_info['Rank'].iloc[0]}"
-                    score_display = f"{account_rank_info['Score'].iloc[0]:.2f}"
+                account_score = account_scores.loc[selected_account]
+                account_rank = int(account_score['Rank'])
+                if account_rank <= len(rankings):
+                    rank_display = f"{account_rank}"
                 else:
-                    # Calculate score for accounts not in top 20 using the same weights
-                    weights = {
-                        'roi': 0.3,
-                        'total_pnl': 0.2,
-                        'sharpe_ratio': 0.2,
-                        'win_rate': 0.2,
-                        'max_drawdown': 0.1
-                    }
-                    
-                    # Normalize metrics for score calculation
-                    normalized_metrics = {}
-                    all_metrics = metrics.copy()
-                    
-                    for metric in weights.keys():
-                        if metric == 'max_drawdown':
-                            # For max_drawdown, lower is better
-                            if all_metrics[metric].max() != all_metrics[metric].min():
-                                normalized_metrics[metric] = 1 - (
-                                    (account_metrics_display[metric] - all_metrics[metric].min()) /
-                                    (all_metrics[metric].max() - all_metrics[metric].min())
-                                )
-                            else:
-                                normalized_metrics[metric] = 0.5
-                        else:
-                            # For other metrics, higher is better
-                            if all_metrics[metric].max() != all_metrics[metric].min():
-                                normalized_metrics[metric] = (
-                                    (account_metrics_display[metric] - all_metrics[metric].min()) /
-                                    (all_metrics[metric].max() - all_metrics[metric].min())
-                                )
-                            else:
-                                normalized_metrics[metric] = 0.5
-                    
-                    # Calculate weighted score
-                    score = sum(weights[metric] * normalized_metrics[metric] for metric in weights.keys())
-                    
-                    # Calculate relative rank
-                    all_scores = pd.concat([
-                        rankings['Score'],
-                        pd.Series([score], index=['current'])
-                    ]).sort_values(ascending=False)
-                    relative_rank = all_scores.index.get_loc('current') + 1
-                    
-                    rank_display = f"#{relative_rank} (Not in Top 20)"
-                    score_display = f"{score:.2f}"
+                    rank_display = f"#{account_rank} (Not in Top 20)"
+                score_display = f"{account_score['Score']:.2f}"
                 
                 st.sidebar.markdown(f"""
                     <div class='info-card'>
@@ -416,6 +484,8 @@ if uploaded_file is not None:
                         'Score': '{:.2f}',
                         'ROI (%)': '{:.2f}%',
                         'Total PnL': '${:,.2f}',
+                        'Net PnL': '${:,.2f}',
+                        'Fee Drag (%)': '{:.4f}%',
                         'Sharpe Ratio': '{:.2f}',
                         'Max Drawdown (%)': '{:.2f}%',
                         'Win Rate (%)': '{:.2f}%'
@@ -449,6 +519,8 @@ if uploaded_file is not None:
                             <li><strong>Score:</strong> Overall performance score (0-1)</li>
                             <li><strong>ROI:</strong> Percentage return on investment</li>
                             <li><strong>Total PnL:</strong> Total profit or loss in dollars</li>
+                            <li><strong>Net PnL:</strong> Total PnL after trading fees</li>
+                            <li><strong>Fee Drag:</strong> ROI lost to fees, in percentage points</li>
                             <li><strong>Sharpe Ratio:</strong> Risk-adjusted return (higher is better)</li>
                             <li><strong>Max Drawdown:</strong> Largest peak-to-trough decline</li>
                             <li><strong>Win Rate:</strong> Percentage of profitable trades</li>
@@ -465,7 +537,7 @@ if uploaded_file is not None:
                     </div>
                 """, unsafe_allow_html=True)
                 
-                weights = get_feature_importance()
+                weights = get_feature_importance(profile)
                 fig_weights = go.Figure(data=[
                     go.Bar(
                         x=list(weights.values()),
@@ -486,6 +558,44 @@ if uploaded_file is not None:
                     yaxis_title='Metric'
                 )
                 st.plotly_chart(fig_weights, use_container_width=True)
+                
+                # Rank stability under perturbed weights
+                with st.expander("🎲 Rank Stability Under Weight Changes"):
+                    st.markdown("""
+                        <p>Ranks recomputed for thousands of weight vectors sampled around the selected profile.
+                        A high top-20 probability means the account stays in the top 20 even when the weights shift.</p>
+                    """, unsafe_allow_html=True)
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        n_samples = st.select_slider(
+                            "Weight samples", options=[500, 1000, 2000, 5000], value=1000
+                        )
+                    with col2:
+                        concentration = st.slider(
+                            "Concentration", min_value=5, max_value=200, value=50,
+                            help="Higher values keep sampled weights closer to the profile"
+                        )
+                    stability = get_rank_stability(
+                        upload_key, profile, n_samples, concentration,
+                        metrics, get_metric_matrix(upload_key, metrics)
+                    )
+                    if selected_account != "All Accounts":
+                        stability = stability.loc[[selected_account]]
+                    else:
+                        stability = stability[
+                            (stability['Rank'] <= 20) | (stability['Top 20 Probability'] > 0)
+                        ].sort_values('Top 20 Probability', ascending=False)
+                    st.dataframe(
+                        stability.style.format({
+                            'Mean Rank': '{:.1f}',
+                            'Rank Std': '{:.1f}',
+                            'P5 Rank': '{:.0f}',
+                            'Median Rank': '{:.0f}',
+                            'P95 Rank': '{:.0f}',
+                            'Top 20 Probability': '{:.0%}'
+                        }),
+                        height=400
+                    )
             
             with tabs[1]:
                 # Account Analysis Tab
@@ -542,6 +652,27 @@ if uploaded_file is not None:
                     )
                     fig_pnl.update_layout(**CHART_CONFIG)
                     st.plotly_chart(fig_pnl, use_container_width=True)
+
+                # Equity curve from the bucketed PnL cube
+                resolution = st.radio(
+                    "Equity Curve Resolution",
+                    list(RESOLUTIONS),
+                    index=1,
+                    horizontal=True
+                )
+                equity_cube = get_equity_cube(upload_key, resolution, cleaned_data, account_index)
+                equity_curve = equity_cube.equity_curve(
+                    None if selected_account == "All Accounts" else selected_account
+                )
+                fig_equity = px.line(
+                    x=equity_curve.index,
+                    y=equity_curve.to_numpy(),
+                    labels={'x': 'Time', 'y': 'Cumulative PnL ($)'},
+                    title=f"{'Account' if selected_account != 'All Accounts' else 'Overall'} Equity Curve",
+                    color_discrete_sequence=[COLORS['primary']]
+                )
+                fig_equity.update_layout(**CHART_CONFIG)
+                st.plotly_chart(fig_equity, use_container_width=True)
             
             with tabs[2]:
                 # Trading Patterns Tab
@@ -567,12 +698,13 @@ if uploaded_file is not None:
                 with col1:
                     # Trading Activity
                     if selected_account != "All Accounts":
-                        activity_data = account_data.copy()
+                        activity_data = account_data
                     else:
-                        activity_data = cleaned_data.copy()
+                        activity_data = cleaned_data
                     
                     # Trading Activity by Type
                     trade_counts = activity_data['trade_type'].value_counts()
+                    trade_counts = trade_counts[trade_counts > 0]
                     fig_activity = px.pie(
                         values=trade_counts.values,
                         names=trade_counts.index,
@@ -615,6 +747,52 @@ if uploaded_file is not None:
                     )
                     fig_winloss.update_layout(**CHART_CONFIG)
                     st.plotly_chart(fig_winloss, use_container_width=True)
+
+                # Performance by Symbol
+                symbol_metrics = get_symbol_metrics(upload_key, cleaned_data, account_index)
+                if selected_account != "All Accounts":
+                    if selected_account in symbol_metrics.index:
+                        symbol_performance = symbol_metrics.loc[selected_account]
+                    else:
+                        # No trades with a symbol for this account
+                        symbol_performance = symbol_metrics.iloc[:0].droplevel('Port_IDs')
+                else:
+                    symbol_performance = symbol_metrics.groupby(level='symbol').agg({
+                        'total_pnl': 'sum',
+                        'total_positions': 'sum',
+                        'win_positions': 'sum'
+                    })
+                    symbol_performance['win_rate'] = (
+                        symbol_performance['win_positions'] / symbol_performance['total_positions'] * 100
+                    )
+                symbol_performance = symbol_performance.sort_values('total_pnl', ascending=False)
+
+                if symbol_performance.empty:
+                    st.write("No per-symbol trades for this account.")
+                else:
+                    fig_symbols = px.bar(
+                        symbol_performance.head(20).reset_index(),
+                        x='symbol',
+                        y='total_pnl',
+                        title=f"{'Account' if selected_account != 'All Accounts' else 'Overall'} PnL by Symbol (Top 20)",
+                        color='win_rate',
+                        color_continuous_scale='RdYlGn',
+                        labels={'total_pnl': 'Total PnL', 'win_rate': 'Win Rate (%)', 'symbol': 'Symbol'}
+                    )
+                    fig_symbols.update_layout(**CHART_CONFIG)
+                    st.plotly_chart(fig_symbols, use_container_width=True)
+
+                if selected_account != "All Accounts":
+                    st.dataframe(
+                        symbol_performance.style.format({
+                            'roi': '{:.2f}%',
+                            'total_pnl': '${:,.2f}',
+                            'sharpe_ratio': '{:.2f}',
+                            'max_drawdown': '{:.2f}%',
+                            'win_rate': '{:.2f}%'
+                        }),
+                        use_container_width=True
+                    )
             
             with tabs[3]:
                 # Risk Analysis Tab
@@ -712,7 +890,7 @@ if uploaded_file is not None:
                 if selected_account != "All Accounts":
                     positions, trade_types = get_trade_summary(account_data)
                 else:
-                    positions, trade_types = get_trade_summary(cleaned_data)
+                    positions, trade_types = get_trade_breakdown(upload_key, cleaned_data)
                 
                 col1, col2 = st.columns(2)
                 
@@ -722,6 +900,7 @@ if uploaded_file is not None:
                         trade_dist = account_data['trade_type'].value_counts()
                     else:
                         trade_dist = cleaned_data['trade_type'].value_counts()
+                    trade_dist = trade_dist[trade_dist > 0]
                     
                     fig_types = px.pie(
                         values=trade_dist.values,
@@ -735,9 +914,9 @@ if uploaded_file is not None:
                 with col2:
                     # Position Sizes
                     if selected_account != "All Accounts":
-                        size_data = account_data.groupby('trade_type')['money_value'].mean()
+                        size_data = account_data.groupby('trade_type', observed=True)['money_value'].mean()
                     else:
-                        size_data = cleaned_data.groupby('trade_type')['money_value'].mean()
+                        size_data = cleaned_data.groupby('trade_type', observed=True)['money_value'].mean()
                     
                     fig_sizes = px.bar(
                         x=size_data.index,
@@ -757,9 +936,8 @@ if uploaded_file is not None:
                     </div>
                 """, unsafe_allow_html=True)
                 
-                summary_df = positions.copy()
                 st.dataframe(
-                    summary_df.style.format({
+                    positions.style.format({
                         'total_trades': '{:,.0f}',
                         'winning_trades': '{:,.0f}',
                         'total_value': '${:,.2f}',
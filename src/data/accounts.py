@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+
+def sort_by_account(data):
+    """
+    Trades reordered by Port_IDs, then timestamp, with a fresh RangeIndex
+
+    The sort is stable, so fills with the same account and timestamp keep
+    their input order.  max_drawdown compounds fills in this order, so for
+    accounts with tied timestamps it can differ from a per-account
+    sort_values('timestamp'), which does not keep ties in order.
+    """
+    if 'timestamp' in data.columns:
+        order = np.lexsort((data['timestamp'].to_numpy(), data['Port_IDs'].to_numpy()))
+    else:
+        order = np.argsort(data['Port_IDs'].to_numpy(), kind='stable')
+    if np.all(order[1:] > order[:-1]):
+        # Already in order: share the columns, only the index is new
+        data = data.copy(deep=False)
+        data.index = pd.RangeIndex(len(data))
+        return data
+    return data.take(order).reset_index(drop=True)
+
+
+class AccountIndex:
+    """
+    CSR-style offsets of each account's trades in a table sorted by Port_IDs
+
+    The trades of port_ids[i] are rows offsets[i]:offsets[i + 1], so an
+    account's trades are a positional slice found with one hash lookup
+    instead of a scan of the whole Port_IDs column.
+    """
+
+    def __init__(self, port_ids, offsets):
+        self.port_ids = pd.Index(port_ids)
+        self.offsets = offsets
+
+    @classmethod
+    def from_sorted(cls, port_ids):
+        """Build the index from the Port_IDs column of a sorted table"""
+        values = np.asarray(port_ids)
+        if not len(values):
+            return cls(values, np.zeros(1, dtype=np.int64))
+        starts = np.flatnonzero(np.r_[True, values[1:] != values[:-1]])
+        if not np.all(values[starts[1:]] > values[starts[:-1]]):
+            raise ValueError("Trades must be sorted by Port_IDs (see sort_by_account)")
+        return cls(values[starts], np.r_[starts, len(values)])
+
+    def __len__(self):
+        return len(self.port_ids)
+
+    def __contains__(self, port_id):
+        return port_id in self.port_ids
+
+    def counts(self):
+        """Number of trades per account"""
+        return np.diff(self.offsets)
+
+    def codes(self):
+        """Account number (0..len - 1) of every row, as pd.factorize(sort=True) gives"""
+        return np.repeat(np.arange(len(self)), self.counts())
+
+    def slice(self, port_id):
+        """Positional slice of one account's rows; KeyError if unknown"""
+        i = self.port_ids.get_loc(port_id)
+        return slice(int(self.offsets[i]), int(self.offsets[i + 1]))
+
+    def rows(self, data, port_id):
+        """One account's trades from the indexed table, without copying"""
+        return data.iloc[self.slice(port_id)]
@@ -0,0 +1,162 @@
+import hashlib
+import os
+import time
+import uuid
+
+# Bump when the layout of cached tables changes so stale entries are ignored
+CACHE_VERSION = 3
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    'TRADE_CACHE_DIR',
+    os.path.join(os.path.expanduser('~'), '.cache', 'binance-trade-analyzer')
+)
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3       # 2 GiB
+DEFAULT_MAX_AGE = 7 * 24 * 60 * 60      # 7 days, in seconds
+
+_SUFFIX = '.arrow'
+
+
+def content_key(content, *params):
+    """
+    Build a cache key from raw file bytes and any parameters that change
+    the cached result
+    """
+    digest = hashlib.sha256()
+    digest.update(f"v{CACHE_VERSION}".encode())
+    for param in params:
+        digest.update(b'\x00' + repr(param).encode())
+    digest.update(b'\x00')
+    digest.update(content)
+    return digest.hexdigest()
+
+
+class TradeCache:
+    """
+    Content-addressed on-disk cache of trade tables
+
+    Entries are uncompressed Arrow IPC files, so a hit memory-maps the
+    table instead of re-parsing the CSV, and its numeric columns are used
+    in place rather than copied onto the heap.  Those columns are
+    read-only: setting values in place (df.loc[0, 'fee'] = 1.0) raises
+    ValueError, so callers that do so should ask get() for a writable copy.
+    Adding or replacing whole columns works either way.
+
+    After every write the cache drops entries older than max_age seconds,
+    then the least recently used ones until it fits in max_bytes.  When
+    pyarrow is not installed the cache is disabled: get() always misses and
+    put() does nothing.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES,
+                 max_age=DEFAULT_MAX_AGE):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        try:
+            import pyarrow  # noqa: F401
+            self.enabled = True
+        except ImportError:
+            self.enabled = False
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + _SUFFIX)
+
+    def get(self, key, writable=False):
+        """
+        Return the cached DataFrame for key, or None on a miss
+
+        By default numeric columns are read-only views of the mapped file;
+        writable=True copies them onto the heap instead.
+        """
+        if not self.enabled:
+            return None
+
+        import pyarrow as pa
+
+        path = self._path(key)
+        try:
+            with pa.memory_map(path, 'r') as source:
+                table = pa.ipc.open_file(source).read_all()
+        except (OSError, pa.ArrowInvalid):
+            return None
+
+        # Record the hit for least-recently-used eviction
+        os.utime(path)
+        # Without block consolidation, numeric columns without nulls are
+        # read-only views of the mapped file instead of copies
+        frame = table.to_pandas(split_blocks=True)
+        return frame.copy() if writable else frame
+
+    def put(self, key, frame):
+        """Store frame under key and evict old entries"""
+        if not self.enabled:
+            return
+
+        import pyarrow as pa
+
+        os.makedirs(self.directory, exist_ok=True)
+        table = pa.Table.from_pandas(frame)
+
+        # Write to a temporary file first so readers never see partial data
+        tmp_path = os.path.join(self.directory, f".{uuid.uuid4().hex}.tmp")
+        try:
+            with pa.OSFile(tmp_path, 'wb') as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            os.replace(tmp_path, self._path(key))
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        self.evict()
+
+    def entries(self):
+        """List (path, size, last_used) for every cached table"""
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+
+        entries = []
+        for name in names:
+            if not name.endswith(_SUFFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def evict(self):
+        """Drop expired entries, then least recently used ones over budget"""
+        now = time.time()
+        entries = []
+        for path, size, last_used in self.entries():
+            if self.max_age is not None and now - last_used > self.max_age:
+                self._remove(path)
+            else:
+                entries.append((path, size, last_used))
+
+        if self.max_bytes is None:
+            return
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in sorted(entries, key=lambda entry: entry[2]):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def clear(self):
+        """Remove every cached table"""
+        for path, _, _ in self.entries():
+            self._remove(path)
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            # Already gone, or still mapped by a reader on Windows
+            pass
@@ -0,0 +1,133 @@
+import array
+
+import numpy as np
+import pandas as pd
+
+# Typed storage for the fields of a Binance trade record.  Fields mapped to
+# None (and any unknown field) are kept as plain Python lists.
+TRADE_FIELDS = {
+    'time': 'q',
+    'symbol': None,
+    'side': None,
+    'price': 'd',
+    'fee': 'd',
+    'quantity': 'd',
+    'realizedProfit': 'd',
+    'qty': 'd',
+    'positionSide': None,
+    'activeBuy': 'b',
+}
+
+# Python type each typecode accepts without changing the resulting dtype
+_TYPECODE_PYTYPES = {'q': int, 'd': float, 'b': bool}
+_TYPECODE_DTYPES = {'q': np.int64, 'd': np.float64, 'b': np.bool_}
+
+
+def _array_to_list(values):
+    """Convert a typed array back to the Python values it was built from"""
+    if values.typecode == 'b':
+        return [bool(value) for value in values]
+    return values.tolist()
+
+
+class TradeColumns:
+    """
+    Columnar accumulator for parsed trades
+
+    Blocks of parsed columns (one block per account) are appended straight
+    into per-field typed arrays, so no per-trade dict is ever materialised.
+    A typed field falls back to a plain list as soon as it sees a value of
+    another type (or a missing value), which keeps to_frame() producing
+    exactly what pd.DataFrame would infer from the raw values.
+    """
+
+    def __init__(self):
+        self._columns = {}
+        self._port_ids = []
+        self._port_counts = []
+        self._port_position = None
+        self.n_trades = 0
+
+    def __len__(self):
+        return self.n_trades
+
+    def _new_column(self, key):
+        typecode = TRADE_FIELDS.get(key)
+        if typecode is not None and self.n_trades == 0:
+            return array.array(typecode)
+        return [None] * self.n_trades
+
+    def _demote(self, key):
+        column = self._columns[key]
+        if isinstance(column, array.array):
+            column = self._columns[key] = _array_to_list(column)
+        return column
+
+    def _extend_column(self, key, values):
+        column = self._columns.get(key)
+        if column is None:
+            column = self._columns[key] = self._new_column(key)
+        if isinstance(column, array.array):
+            if isinstance(values, array.array):
+                if values.typecode == column.typecode:
+                    column.extend(values)
+                    return
+            elif set(map(type, values)) == {_TYPECODE_PYTYPES[column.typecode]}:
+                column.extend(values)
+                return
+            column = self._demote(key)
+        if isinstance(values, array.array):
+            values = _array_to_list(values)
+        column.extend(values)
+
+    def _pad(self, total):
+        for key, column in self._columns.items():
+            if len(column) < total:
+                column = self._demote(key)
+                column.extend([None] * (total - len(column)))
+
+    def append(self, columns, n_records, port_id):
+        """Append a block of n_records parsed trades belonging to port_id"""
+        if not n_records:
+            return
+
+        for key, values in columns.items():
+            self._extend_column(key, values)
+        self._pad(self.n_trades + n_records)
+
+        if self._port_position is None:
+            # Port_IDs follows the keys of the first trade block, as it did
+            # when it was appended to every trade dict
+            self._port_position = len(self._columns)
+        self._port_ids.append(port_id)
+        self._port_counts.append(n_records)
+        self.n_trades += n_records
+
+    def extend(self, other):
+        """Append all trades accumulated by another TradeColumns"""
+        if not other.n_trades:
+            return
+
+        for key, values in other._columns.items():
+            self._extend_column(key, values)
+        self._pad(self.n_trades + other.n_trades)
+
+        if self._port_position is None:
+            self._port_position = other._port_position
+        self._port_ids.extend(other._port_ids)
+        self._port_counts.extend(other._port_counts)
+        self.n_trades += other.n_trades
+
+    def to_frame(self):
+        """Build the trade DataFrame, viewing typed arrays without copying"""
+        data = {}
+        for key, column in self._columns.items():
+            if isinstance(column, array.array):
+                data[key] = np.frombuffer(column, dtype=_TYPECODE_DTYPES[column.typecode])
+            else:
+                data[key] = column
+
+        port_ids = np.repeat(pd.Series(self._port_ids).to_numpy(), self._port_counts)
+        items = list(data.items())
+        items.insert(self._port_position or 0, ('Port_IDs', port_ids))
+        return pd.DataFrame(dict(items), copy=False)
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+
+# Low-cardinality string columns stored as categoricals
+CATEGORICAL_COLUMNS = ('symbol', 'side', 'positionSide', 'baseAsset')
+
+# Asset columns that usually hold one value for a whole file.  A constant
+# column is dropped and its value kept in data.attrs['constant_columns'];
+# otherwise it becomes a categorical.
+CONSTANT_CANDIDATES = ('feeAsset', 'quantityAsset', 'realizedProfitAsset')
+
+BOOL_COLUMNS = ('activeBuy',)
+
+# Columns that may be stored as float32, when every value is exactly a
+# float32.  The metric inputs (quantity, realizedProfit, fee) always stay
+# float64 so results are unchanged.
+FLOAT32_CANDIDATES = ('price', 'qty')
+
+
+def float32_exact(values):
+    """
+    True if every value is exactly a float32, so that widening the float32
+    column back with astype(np.float64) gives the original values (NaN
+    counts as equal)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    with np.errstate(over='ignore'):
+        round_trip = values.astype(np.float32).astype(np.float64)
+    return bool(np.all((round_trip == values) | np.isnan(values)))
+
+
+def apply_dtype_plan(data):
+    """
+    Shrink a trade DataFrame in place and return it
+
+    Low-cardinality strings become categoricals, activeBuy becomes bool,
+    constant asset columns are dropped into data.attrs['constant_columns'],
+    and price/qty become float32 where float32_exact allows.
+    """
+    constants = dict(data.attrs.get('constant_columns', {}))
+    for column in CONSTANT_CANDIDATES:
+        if column not in data.columns:
+            continue
+        values = data[column].unique()
+        if len(values) == 1 and pd.notna(values[0]):
+            constants[column] = values[0]
+            data.drop(columns=column, inplace=True)
+        else:
+            data[column] = data[column].astype('category')
+    if constants:
+        data.attrs['constant_columns'] = constants
+
+    for column in CATEGORICAL_COLUMNS:
+        if column in data.columns and not isinstance(data[column].dtype, pd.CategoricalDtype):
+            data[column] = data[column].astype('category')
+
+    for column in BOOL_COLUMNS:
+        if column in data.columns and data[column].dtype != bool:
+            if data[column].isin([True, False]).all():
+                data[column] = data[column].astype(bool)
+
+    for column in FLOAT32_CANDIDATES:
+        if column in data.columns and data[column].dtype == np.float64:
+            if float32_exact(data[column].to_numpy()):
+                data[column] = data[column].astype(np.float32)
+
+    return data
+
+
+def memory_report(before, after):
+    """
+    Per-column memory of a trade DataFrame before and after apply_dtype_plan
+
+    Returns a DataFrame indexed by column with dtypes, total bytes and
+    bytes per trade on both sides; dropped columns show an empty dtype and
+    0 bytes after.  The last row, 'total', sums every column.
+    """
+    before_bytes = before.memory_usage(deep=True, index=False)
+    after_bytes = after.memory_usage(deep=True, index=False).reindex(before_bytes.index, fill_value=0)
+    report = pd.DataFrame({
+        'dtype_before': before.dtypes.astype(str),
+        'dtype_after': after.dtypes.astype(str).reindex(before_bytes.index, fill_value=''),
+        'bytes_before': before_bytes,
+        'bytes_after': after_bytes,
+    })
+    report.loc['total'] = ['', '', before_bytes.sum(), after_bytes.sum()]
+    report['bytes_before'] = report['bytes_before'].astype(np.int64)
+    report['bytes_after'] = report['bytes_after'].astype(np.int64)
+
+    report['per_trade_before'] = report['bytes_before'] / max(len(before), 1)
+    report['per_trade_after'] = report['bytes_after'] / max(len(after), 1)
+    return report
@@ -0,0 +1,173 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from .columnar import TradeColumns
+from .parser import parse_trade_history
+
+# Shards per worker; more shards than workers evens out accounts with very
+# different trade counts.
+SHARDS_PER_WORKER = 4
+
+# Default working-memory budget for chunked reads, in bytes
+DEFAULT_MEMORY_BUDGET = 256 * 1024 ** 2
+
+# Peak working memory per byte of raw Trade_History text while a chunk is
+# parsed: the raw strings, their JSON transcoding, the decoded dicts and the
+# column lists, measured with benchmarks/bench_memory.py.
+WORKING_SET_FACTOR = 12
+
+
+def parse_histories(port_ids, histories):
+    """
+    Parse Trade_History values into a TradeColumns accumulator
+
+    Returns (trade_columns, skipped) where skipped lists the Port_IDs whose
+    history could not be parsed.  Missing (NaN) histories are ignored.
+    """
+    trade_columns = TradeColumns()
+    skipped = []
+    for port_id, history in zip(port_ids, histories):
+        # Skip if Trade_History is NaN
+        if pd.isna(history):
+            continue
+
+        try:
+            columns, n_records = parse_trade_history(history)
+        except (ValueError, SyntaxError):
+            skipped.append(port_id)
+            continue
+
+        trade_columns.append(columns, n_records, port_id)
+    return trade_columns, skipped
+
+
+def _parse_shard(shard):
+    return parse_histories(*shard)
+
+
+def _shard_bounds(histories, n_shards):
+    """Split rows into contiguous shards of roughly equal text length"""
+    sizes = [len(history) if isinstance(history, str) else 0 for history in histories]
+    target = sum(sizes) / n_shards
+    bounds = [0]
+    running = 0
+    for i, size in enumerate(sizes):
+        running += size
+        if running >= target * len(bounds) and i + 1 < len(sizes):
+            bounds.append(i + 1)
+    bounds.append(len(sizes))
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def parse_histories_parallel(port_ids, histories, workers=None, executor=None):
+    """
+    Parse Trade_History values across a process pool
+
+    Rows are split into contiguous shards, each parsed into its own
+    TradeColumns, and the shards are concatenated in input order so the
+    result is identical to parse_histories.  workers=None uses every CPU
+    core.  Pass executor to reuse a running pool (with workers set to its
+    size) instead of starting one for this call.
+    """
+    port_ids = list(port_ids)
+    histories = list(histories)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(histories) < 2:
+        return parse_histories(port_ids, histories)
+
+    shards = [
+        (port_ids[start:stop], histories[start:stop])
+        for start, stop in _shard_bounds(histories, workers * SHARDS_PER_WORKER)
+    ]
+
+    if executor is None:
+        with ProcessPoolExecutor(max_workers=min(workers, len(shards))) as executor:
+            return _collect_shards(executor.map(_parse_shard, shards))
+    return _collect_shards(executor.map(_parse_shard, shards))
+
+
+def _collect_shards(results):
+    """Concatenate per-shard (trade_columns, skipped) results in order"""
+    trade_columns = TradeColumns()
+    skipped = []
+    for shard_columns, shard_skipped in results:
+        trade_columns.extend(shard_columns)
+        skipped.extend(shard_skipped)
+    return trade_columns, skipped
+
+
+def find_history_column(columns):
+    """Return the name of the trade history column, or None"""
+    if 'Trade_History' in columns:
+        return 'Trade_History'
+    possible_columns = [col for col in columns if 'trade' in col.lower() or 'history' in col.lower()]
+    return possible_columns[0] if possible_columns else None
+
+
+def iter_history_chunks(file_path, memory_budget=DEFAULT_MEMORY_BUDGET):
+    """
+    Read (port_ids, histories) from the CSV in chunks of rows
+
+    The first chunk is a single row; after that the chunk size is chosen so
+    the raw text times WORKING_SET_FACTOR stays within memory_budget bytes,
+    using the average row size seen so far.  Only one chunk of raw text is
+    held at a time.
+    """
+    rows = 1
+    total_rows = 0
+    total_bytes = 0
+    column = None
+    with pd.read_csv(file_path, iterator=True) as reader:
+        while True:
+            try:
+                chunk = reader.get_chunk(rows)
+            except StopIteration:
+                return
+
+            if column is None:
+                column = find_history_column(chunk.columns)
+                if column is None or 'Port_IDs' not in chunk.columns:
+                    raise ValueError(
+                        "Chunked loading needs Port_IDs and Trade_History columns"
+                    )
+            if chunk.empty:
+                # A header with no rows
+                return
+
+            port_ids = chunk['Port_IDs'].tolist()
+            histories = chunk[column].tolist()
+            del chunk
+
+            total_rows += len(histories)
+            total_bytes += sum(len(history) for history in histories if isinstance(history, str))
+
+            yield port_ids, histories
+            del port_ids, histories
+
+            average_row_bytes = max(total_bytes / total_rows, 1)
+            rows = max(1, int(memory_budget // (average_row_bytes * WORKING_SET_FACTOR)))
+
+
+def iter_trade_columns(file_path, memory_budget=DEFAULT_MEMORY_BUDGET, workers=1):
+    """
+    Parse the CSV chunk by chunk, yielding (trade_columns, skipped) per chunk
+
+    Each chunk's raw Trade_History text is released before the next chunk
+    is read, so a caller that reduces every chunk (rather than keeping it)
+    runs in roughly memory_budget bytes regardless of the file size.  With
+    workers > 1 (None for every core) one process pool is started for the
+    whole file and shut down when the iteration ends.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1:
+        for port_ids, histories in iter_history_chunks(file_path, memory_budget):
+            yield parse_histories(port_ids, histories)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for port_ids, histories in iter_history_chunks(file_path, memory_budget):
+            yield parse_histories_parallel(port_ids, histories, workers, executor)
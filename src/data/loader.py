@@ -1,8 +1,14 @@
+import os
+
 import pandas as pd
 import numpy as np
-import streamlit as st
-import json
-import ast
+
+from .ingest import DEFAULT_MEMORY_BUDGET, iter_trade_columns, parse_histories_parallel
+from .accounts import sort_by_account
+from .columnar import TradeColumns
+from .dtypes import apply_dtype_plan
+from .reporting import get_reporter
+from .store import TradeStore, is_trade_store
 
 REQUIRED_COLUMNS = [
     'Port_IDs', 'timestamp', 'symbol', 'side', 
@@ -56,11 +62,124 @@ def validate_columns(data):
             )
     return data
 
-def load_data(file_path):
+def to_trade_frame(trade_columns):
+    """
+    Convert parsed trade columns to a validated, memory-compact trade
+    DataFrame (see data.dtypes.apply_dtype_plan)
+    """
+    data = trade_columns.to_frame()
+
+    # Convert timestamp from milliseconds to datetime if 'time' exists
+    if 'time' in data.columns:
+        data['timestamp'] = pd.to_datetime(data['time'], unit='ms')
+        data = data.drop('time', axis=1)
+
+    # Validate and map columns
+    return apply_dtype_plan(validate_columns(data))
+
+def iter_trades(file_path, memory_budget=DEFAULT_MEMORY_BUDGET, workers=1, reporter=None):
+    """
+    Stream trade DataFrames from a Port_IDs/Trade_History CSV
+
+    Yields one frame per chunk of accounts, reading only as many rows at a
+    time as fit in memory_budget bytes of working memory.  Reduce each
+    frame as it arrives to process exports larger than memory.  Each
+    frame has its own categories and constant columns, so join frames
+    with concat_trades rather than pd.concat.
+    """
+    reporter = reporter or get_reporter()
+    for trade_columns, skipped in iter_trade_columns(file_path, memory_budget, workers):
+        for port_id in skipped:
+            reporter.warning(f"Skipping malformed trade history for Port_ID: {port_id}")
+        if len(trade_columns):
+            yield to_trade_frame(trade_columns)
+
+def concat_trades(frames):
+    """
+    Concatenate trade frames from iter_trades into one
+
+    Categorical columns are recoded to the union of their categories (plain
+    pd.concat turns differing categoricals back into strings), a constant
+    column that differs between frames is expanded back into a categorical
+    column.
+    """
+    frames = list(frames)
+    if not frames:
+        return pd.DataFrame()
+
+    frame_constants = [frame.attrs.get('constant_columns', {}) for frame in frames]
+    shared = {
+        column: value for column, value in frame_constants[0].items()
+        if all(column in constants and constants[column] == value for constants in frame_constants)
+    }
+    expanded = []
+    for frame, constants in zip(frames, frame_constants):
+        frame = frame.copy(deep=False)
+        for column, value in constants.items():
+            if column not in shared:
+                frame[column] = pd.Categorical.from_codes(np.zeros(len(frame), dtype=np.int8), [value])
+        expanded.append(frame)
+    frames = expanded
+
+    for column in frames[0].columns:
+        if not all(column in frame.columns for frame in frames):
+            continue
+        dtypes = [frame[column].dtype for frame in frames]
+        if all(isinstance(dtype, pd.CategoricalDtype) for dtype in dtypes):
+            categories = pd.api.types.union_categoricals(
+                [frame[column] for frame in frames], sort_categories=True
+            ).categories
+            for frame in frames:
+                frame[column] = frame[column].cat.set_categories(categories)
+
+    data = pd.concat(frames, ignore_index=True)
+    data.attrs = {'constant_columns': shared} if shared else {}
+    return data
+
+def _report_trades(data, reporter):
+    """Display basic information about the dataset"""
+    reporter.write("Dataset Information:")
+    info = inspect_dataset(data)
+    reporter.write(f"Total Rows: {info['total_rows']:,}")
+    reporter.write(f"Total Accounts: {info['total_accounts']:,}")
+    reporter.write(f"Date Range: {info['date_range'][0]} to {info['date_range'][1]}")
+    reporter.write(f"Total Trading Pairs: {info['total_symbols']}")
+    return data
+
+def load_data(file_path, workers=1, memory_budget=None, reporter=None):
     """
     Load and preprocess Binance trade data
+
+    workers: number of processes used to parse Trade_History
+    (None uses every CPU core, 1 parses in this process)
+    memory_budget: if set, read the CSV in chunks that fit this many bytes
+    of working memory instead of loading the raw file at once
+    reporter: where progress messages go (see data.reporting); defaults to
+    get_reporter()
+
+    file_path may also be a TradeStore directory, which is memory-mapped
+    instead of parsed; use TradeStore.read directly for date or account
+    range queries.
     """
+    reporter = reporter or get_reporter()
     try:
+        if isinstance(file_path, (str, os.PathLike)) and is_trade_store(file_path):
+            data = TradeStore(file_path).read()
+            if not len(data):
+                raise ValueError("No valid trades found in the data")
+            return _report_trades(data, reporter)
+
+        if memory_budget is not None:
+            # Keep only compact parsed columns between chunks
+            trade_columns = TradeColumns()
+            for chunk_columns, skipped in iter_trade_columns(file_path, memory_budget, workers):
+                for port_id in skipped:
+                    reporter.warning(f"Skipping malformed trade history for Port_ID: {port_id}")
+                trade_columns.extend(chunk_columns)
+            if not len(trade_columns):
+                raise ValueError("No valid trades found in the data")
+            return _report_trades(to_trade_frame(trade_columns), reporter)
+
         # Load the dataset
         data = pd.read_csv(file_path)
         
@@ -71,11 +190,11 @@ def load_data(file_path):
             if possible_columns:
                 # Use the first matching column
                 data.rename(columns={possible_columns[0]: 'Trade_History'}, inplace=True)
-                st.info(f"Using column '{possible_columns[0]}' as trade history data")
+                reporter.info(f"Using column '{possible_columns[0]}' as trade history data")
             else:
                 # If no trade history column is found, try to use the data as is
                 if all(col in data.columns for col in REQUIRED_COLUMNS):
-                    st.info("Using direct trade data format")
+                    reporter.info("Using direct trade data format")
                     return data
                 else:
                     raise ValueError(
@@ -83,79 +202,40 @@ def load_data(file_path):
                         f"Required columns are: {', '.join(REQUIRED_COLUMNS)}"
                     )
         
-        # Parse the Trade_History column which contains JSON string
-        trades_list = []
-        for _, row in data.iterrows():
-            # Skip if Trade_History is NaN
-            if pd.isna(row['Trade_History']):
-                continue
-                
-            try:
-                # First try json.loads
-                trades = json.loads(row['Trade_History'])
-            except (json.JSONDecodeError, TypeError):
-                try:
-                    # If that fails, try ast.literal_eval which is safer than eval
-                    trades = ast.literal_eval(row['Trade_History'])
-                except (ValueError, SyntaxError):
-                    # Skip malformed entries
-                    st.warning(f"Skipping malformed trade history for Port_ID: {row['Port_IDs']}")
-                    continue
-            
-            # Handle both single trade and list of trades
-            if isinstance(trades, dict):
-                trades = [trades]  # Convert single trade to list
-            elif not isinstance(trades, list):
-                continue
-                
-            for trade in trades:
-                if isinstance(trade, dict):  # Ensure trade is a dictionary
-                    trade['Port_IDs'] = row['Port_IDs']
-                    trades_list.append(trade)
-        
-        if not trades_list:
+        # Parse the Trade_History column straight into typed columns
+        trade_columns, skipped = parse_histories_parallel(
+            data['Port_IDs'], data['Trade_History'], workers=workers
+        )
+        for port_id in skipped:
+            # Skip malformed entries
+            reporter.warning(f"Skipping malformed trade history for Port_ID: {port_id}")
+
+        if not len(trade_columns):
             # If no trades were parsed, try to use the data as is
             if all(col in data.columns for col in REQUIRED_COLUMNS):
-                st.info("Using direct trade data format")
+                reporter.info("Using direct trade data format")
                 return data
             else:
                 raise ValueError("No valid trades found in the data")
             
-        # Convert list of trades to DataFrame
-        data = pd.DataFrame(trades_list)
-        
-        # Convert timestamp from milliseconds to datetime if 'time' exists
-        if 'time' in data.columns:
-            data['timestamp'] = pd.to_datetime(data['time'], unit='ms')
-            data = data.drop('time', axis=1)
-        
-        # Display basic information about the dataset
-        st.write("Dataset Information:")
-        info = inspect_dataset(data)
-        st.write(f"Total Rows: {info['total_rows']:,}")
-        st.write(f"Total Accounts: {info['total_accounts']:,}")
-        st.write(f"Date Range: {info['date_range'][0]} to {info['date_range'][1]}")
-        st.write(f"Total Trading Pairs: {info['total_symbols']}")
-        
-        # Validate and map columns
-        data = validate_columns(data)
-        
-        return data
+        # Convert trade columns to DataFrame
+        return _report_trades(to_trade_frame(trade_columns), reporter)
     except Exception as e:
-        st.error(f"Error loading data: {str(e)}")
-        st.stop()
+        reporter.error(f"Error loading data: {str(e)}")
+        reporter.stop()
 
-def preprocess_trades(data):
+def preprocess_trades(data, reporter=None):
     """
     Preprocess trade data with necessary transformations
     """
-    df = data.copy()
+    reporter = reporter or get_reporter()
+    df = data.copy(deep=False)
     
     try:
         # Create position identifiers
-        df['position_type'] = df.apply(
-            lambda x: f"{str(x['side']).lower()}_{str(x['positionSide']).lower()}", 
-            axis=1
+        df['position_type'] = label_pairs(
+            df['side'], df['positionSide'],
+            lambda side, position_side: f"{str(side).lower()}_{str(position_side).lower()}"
         )
         
         # Convert timestamp to datetime if it's not already
@@ -165,39 +245,48 @@ def preprocess_trades(data):
         # Sort by Port_IDs and timestamp
         df = df.sort_values(['Port_IDs', 'timestamp'])
         
-        # Ensure numeric columns are properly typed
-        df['price'] = pd.to_numeric(df['price'], errors='coerce')
-        df['quantity'] = pd.to_numeric(df['quantity'], errors='coerce')
-        df['realizedProfit'] = pd.to_numeric(df['realizedProfit'], errors='coerce')
+        # Ensure numeric columns are properly typed, widening float32 price
+        # and qty storage to float64 before any arithmetic on them
+        for column in ('price', 'quantity', 'realizedProfit'):
+            df[column] = pd.to_numeric(df[column], errors='coerce').astype(np.float64)
         
         # Add trade value column
         df['trade_value'] = df['price'] * df['quantity']
         
         return df
     except Exception as e:
-        st.error(f"Error preprocessing trades: {str(e)}")
-        st.stop()
+        reporter.error(f"Error preprocessing trades: {str(e)}")
+        reporter.stop()
 
-def handle_missing_values(data):
+def handle_missing_values(data, reporter=None):
     """
     Handle missing values in the dataset
     """
-    df = data.copy()
+    reporter = reporter or get_reporter()
+    df = data.copy(deep=False)
     
     # Report missing values
     missing_values = df.isnull().sum()
     if missing_values.any():
-        st.warning("Missing values found in the following columns:")
+        reporter.warning("Missing values found in the following columns:")
         for col, count in missing_values[missing_values > 0].items():
-            st.write(f"- {col}: {count:,} missing values")
+            reporter.write(f"- {col}: {count:,} missing values")
     
+    # Only columns with gaps are rewritten, one whole column at a time, so
+    # the rest stay shared with data and data itself is never written to
+    incomplete = missing_values.index[missing_values > 0]
+
     # Fill missing numerical values with 0
-    numeric_columns = df.select_dtypes(include=[np.number]).columns
-    df[numeric_columns] = df[numeric_columns].fillna(0)
+    for column in df[incomplete].select_dtypes(include=[np.number]).columns:
+        df[column] = df[column].fillna(0)
     
     # Fill missing categorical values with 'Unknown'
-    categorical_columns = df.select_dtypes(include=['object']).columns
-    df[categorical_columns] = df[categorical_columns].fillna('Unknown')
+    for column in df[incomplete].select_dtypes(include=['object', 'string']).columns:
+        df[column] = df[column].fillna('Unknown')
+    for column in df[incomplete].select_dtypes(include=['category']).columns:
+        if 'Unknown' not in df[column].cat.categories:
+            df[column] = df[column].cat.add_categories('Unknown')
+        df[column] = df[column].fillna('Unknown')
     
     return df
 
@@ -214,8 +303,47 @@ def classify_trade(row):
         else:  # SELL
             return f"{position_side.lower()}_close" if position_side == 'LONG' else f"{position_side.lower()}_open"
 
+def label_pairs(left, right, label):
+    """
+    Vectorized label(left, right) for two aligned Series
+
+    Both inputs are factorized, label is called once per distinct
+    (left, right) pair, and the result is a categorical Series built from
+    a lookup table over the pair codes.
+    """
+    left_codes, left_uniques = pd.factorize(left, use_na_sentinel=False)
+    right_codes, right_uniques = pd.factorize(right, use_na_sentinel=False)
+
+    pair_codes, pairs = pd.factorize(left_codes * len(right_uniques) + right_codes)
+    labels = [
+        label(left_uniques[pair // len(right_uniques)], right_uniques[pair % len(right_uniques)])
+        for pair in pairs
+    ]
+    label_codes, categories = pd.factorize(pd.Index(labels))
+
+    return pd.Series(
+        pd.Categorical.from_codes(label_codes[pair_codes], categories),
+        index=left.index
+    )
+
+def classify_trades(data):
+    """Classify every trade based on side and positionSide (see classify_trade)"""
+    if 'positionSide' in data.columns:
+        position_side = data['positionSide']
+    else:
+        position_side = pd.Series('BOTH', index=data.index)
+    return label_pairs(
+        data['side'], position_side,
+        lambda side, position_side: classify_trade({'side': side, 'positionSide': position_side})
+    )
+
 def clean_data(data):
-    """Clean and preprocess the trade data"""
+    """
+    Clean and preprocess the trade data
+
+    Returns a new frame sorted by account; data itself is not modified.
+    """
+    data = data.copy(deep=False)
     # Convert timestamp to datetime if it's not already
     if 'timestamp' in data.columns:
         data['timestamp'] = pd.to_datetime(data['timestamp'])
@@ -224,7 +352,7 @@ def clean_data(data):
     
     # Classify trades
     if 'side' in data.columns:
-        data['trade_type'] = data.apply(classify_trade, axis=1)
+        data['trade_type'] = classify_trades(data)
     
     # Convert quantity fields
     if 'quantity' in data.columns:
@@ -234,14 +362,16 @@ def clean_data(data):
     
     # Calculate trade value in quote currency if not already present
     if 'price' in data.columns and 'coin_amount' in data.columns and 'money_value' not in data.columns:
-        data['money_value'] = data['price'] * data['coin_amount']
+        data['money_value'] = data['price'].astype(np.float64) * data['coin_amount'].astype(np.float64)
     
-    return data
+    # Lay each account's trades out contiguously so AccountIndex can slice them
+    return sort_by_account(data)
 
-def get_account_summary(data):
+def get_account_summary(data, reporter=None):
     """
     Get summary statistics for each account
     """
+    reporter = reporter or get_reporter()
     try:
         summary = data.groupby('Port_IDs').agg({
             'realizedProfit': ['count', 'sum', 'mean'],
@@ -256,15 +386,15 @@ def get_account_summary(data):
         
         return summary
     except Exception as e:
-        st.error(f"Error generating account summary: {str(e)}")
-        st.stop()
+        reporter.error(f"Error generating account summary: {str(e)}")
+        reporter.stop()
 
 def get_trade_summary(data):
     """Get detailed trade summary including position types"""
     summary = pd.DataFrame()
     
     # Group by account and trade type
-    trade_types = data.groupby(['Port_IDs', 'trade_type']).agg({
+    trade_types = data.groupby(['Port_IDs', 'trade_type'], observed=True).agg({
         'realizedProfit': ['count', 'sum'],
         'money_value': 'sum'
     }).round(2)
@@ -0,0 +1,111 @@
+import ast
+import json
+
+# Trade_History values are Python reprs of a list of flat dicts, e.g.
+#   [{'time': 1718899656000, 'symbol': 'SOLUSDT', ..., 'activeBuy': True}]
+# When the text holds no double quotes or backslashes every single quote is
+# a string delimiter, so the literal can be transcoded to JSON with plain
+# str.replace calls and decoded by the C json parser.  Anything outside that
+# subset goes through json.loads / ast.literal_eval exactly as before.
+
+# Substrings that rule out the fast path: escapes/quotes inside strings, and
+# JSON-only spellings that ast.literal_eval would have rejected.
+_UNSAFE = ('"', '\\', 'true', 'false', 'null', 'NaN', 'Infinity')
+
+# Lower-case constants left inside decoded strings mean the replace calls
+# below rewrote string contents rather than literals.
+_TRANSCODED = ('true', 'false', 'null')
+
+
+def _transcode(text):
+    """Rewrite a quote-free Python literal as JSON"""
+    return (
+        text.replace("'", '"')
+        .replace('True', 'true')
+        .replace('False', 'false')
+        .replace('None', 'null')
+    )
+
+
+def _has_transcoded_strings(values):
+    """
+    Check whether any string in values was altered by _transcode; nested
+    lists and dicts are not searched, so they always count as altered
+    """
+    try:
+        joined = '\x00'.join(values)
+    except TypeError:
+        if any(isinstance(v, (list, dict)) for v in values):
+            return True
+        joined = '\x00'.join(v for v in values if isinstance(v, str))
+    return any(token in joined for token in _TRANSCODED)
+
+
+def records_to_columns(trades):
+    """
+    Convert decoded trades (a dict or list of dicts) into columns
+
+    Returns a tuple (columns, n_records) where columns maps each key to a
+    list with one value per trade (None where a trade lacks the key).
+    """
+    if isinstance(trades, dict):
+        trades = [trades]  # Convert single trade to list
+    elif not isinstance(trades, list):
+        return {}, 0
+
+    trades = [trade for trade in trades if isinstance(trade, dict)]
+    if not trades:
+        return {}, 0
+
+    # Fast path: every trade carries the same keys
+    keys = list(trades[0])
+    if set(map(len, trades)) == {len(keys)}:
+        try:
+            return {key: [trade[key] for trade in trades] for key in keys}, len(trades)
+        except KeyError:
+            pass
+
+    columns = {}
+    for n_records, trade in enumerate(trades):
+        for key, value in trade.items():
+            column = columns.get(key)
+            if column is None:
+                column = columns[key] = [None] * n_records
+            elif len(column) < n_records:
+                column.extend([None] * (n_records - len(column)))
+            column.append(value)
+
+    for column in columns.values():
+        if len(column) < len(trades):
+            column.extend([None] * (len(trades) - len(column)))
+
+    return columns, len(trades)
+
+
+def parse_trade_history(text):
+    """
+    Parse a Trade_History literal into columns
+
+    Returns (columns, n_records) as records_to_columns does.  Raises
+    ValueError or SyntaxError for malformed text.
+    """
+    if isinstance(text, str) and not any(token in text for token in _UNSAFE):
+        try:
+            trades = json.loads(_transcode(text))
+        except json.JSONDecodeError:
+            pass
+        else:
+            columns, n_records = records_to_columns(trades)
+            if not _has_transcoded_strings(list(columns)) and not any(
+                _has_transcoded_strings(values) for values in columns.values()
+            ):
+                return columns, n_records
+
+    try:
+        # First try json.loads
+        trades = json.loads(text)
+    except (json.JSONDecodeError, TypeError):
+        # If that fails, try ast.literal_eval which is safer than eval
+        trades = ast.literal_eval(text)
+    return records_to_columns(trades)
+
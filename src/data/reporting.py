@@ -0,0 +1,72 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PipelineStopped(Exception):
+    """Raised by LoggingReporter.stop() after an unrecoverable error"""
+
+
+class LoggingReporter:
+    """
+    Report pipeline progress through the logging module
+
+    A reporter is any object with write, info, warning and error methods
+    taking a message, and a stop() method called after an error has been
+    reported.  This one logs the messages and raises PipelineStopped on
+    stop(), chained to the error being handled.
+    """
+
+    def write(self, message):
+        logger.info(message)
+
+    def info(self, message):
+        logger.info(message)
+
+    def warning(self, message):
+        logger.warning(message)
+
+    def error(self, message):
+        logger.error(message)
+
+    def stop(self):
+        raise PipelineStopped("Processing stopped after an error")
+
+
+class StreamlitReporter:
+    """Report pipeline progress as Streamlit elements"""
+
+    def __init__(self):
+        # Imported here so headless runs never load Streamlit
+        import streamlit as st
+        self._st = st
+
+    def write(self, message):
+        self._st.write(message)
+
+    def info(self, message):
+        self._st.info(message)
+
+    def warning(self, message):
+        self._st.warning(message)
+
+    def error(self, message):
+        self._st.error(message)
+
+    def stop(self):
+        self._st.stop()
+
+
+_reporter = LoggingReporter()
+
+
+def get_reporter():
+    """Return the reporter used when a function is not given one"""
+    return _reporter
+
+
+def set_reporter(reporter):
+    """Set the default reporter; returns the previous one"""
+    global _reporter
+    previous, _reporter = _reporter, reporter
+    return previous
@@ -0,0 +1,340 @@
+import base64
+import json
+import os
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from .dtypes import CONSTANT_CANDIDATES
+
+# Bump when the on-disk layout changes
+STORE_VERSION = 3
+
+MANIFEST = 'manifest.json'
+
+# Per-row content hash kept in every part to skip trades already stored
+_HASH_COLUMN = '_row_hash'
+
+
+def _row_hashes(table):
+    """
+    Content hash of every row of a conformed table
+
+    Each non-null value is hashed together with its column name and the
+    results are summed, so the hash does not depend on column order and a
+    column that is null in a row (e.g. one added to the schema by a later
+    export) leaves that row's hash unchanged.  Numbers are hashed as
+    float64 and times in nanoseconds, so a column the schema widens (int to
+    float, ms to us) keeps its hashes.
+    """
+    hashes = np.zeros(len(table), dtype=np.uint64)
+    for name in table.column_names:
+        if name == _HASH_COLUMN:
+            continue
+        values = table.column(name).to_pandas()
+        if pd.api.types.is_datetime64_any_dtype(values.dtype):
+            values = values.dt.as_unit('ns')
+        elif pd.api.types.is_numeric_dtype(values.dtype) and not pd.api.types.is_bool_dtype(values.dtype):
+            values = values.astype(np.float64)
+        name_key = pd.util.hash_array(np.array([name], dtype=object))[0]
+        column_hashes = pd.util.hash_array(
+            pd.util.hash_pandas_object(values, index=False).to_numpy() ^ name_key
+        )
+        column_hashes[values.isna().to_numpy()] = 0
+        hashes += column_hashes
+    return hashes
+
+
+def is_trade_store(path):
+    """True if path is a TradeStore directory"""
+    return os.path.isfile(os.path.join(path, MANIFEST))
+
+
+class TradeStore:
+    """
+    Append-only columnar store of trades on local disk
+
+    Trades are partitioned by calendar day of their timestamp.  Every
+    append() writes one uncompressed Arrow IPC part per day it touches,
+    with rows sorted by Port_IDs then timestamp, and records it in
+    manifest.json with its row count and Port_IDs range.  Opening a store
+    only reads the manifest; read() memory-maps just the parts whose day
+    and Port_IDs range overlap the query, and finds an account's rows in a
+    part by binary search on its sorted Port_IDs column.
+
+    Appending overlapping exports is safe: a trade already stored (same
+    values in every column) is not stored again, so rolling 90-day
+    exports can be appended week after week.
+
+    Exports need not have the same columns or column order.  The manifest
+    keeps the store's Arrow schema, in canonical column order; every part
+    is written in that schema, and a new column widens it (older parts
+    read back as nulls in that column).
+    """
+
+    def __init__(self, directory):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ImportError("TradeStore requires pyarrow (pip install pyarrow)") from None
+        self.directory = directory
+        self._manifest = self._read_manifest()
+
+    def _read_manifest(self):
+        path = os.path.join(self.directory, MANIFEST)
+        if not os.path.exists(path):
+            return {'version': STORE_VERSION, 'next_part': 0, 'partitions': {}}
+        with open(path) as f:
+            manifest = json.load(f)
+        if manifest.get('version') != STORE_VERSION:
+            raise ValueError(
+                f"Trade store {self.directory} has version {manifest.get('version')}, "
+                f"expected {STORE_VERSION}"
+            )
+        return manifest
+
+    def _schema(self):
+        """The store's Arrow schema, or None before the first append"""
+        import pyarrow as pa
+
+        if 'schema' not in self._manifest:
+            return None
+        return pa.ipc.read_schema(pa.py_buffer(base64.b64decode(self._manifest['schema'])))
+
+    def _conform(self, table):
+        """
+        Select and cast table to the store schema, first widening the
+        schema with any columns the store has not seen yet
+        """
+        import pyarrow as pa
+
+        schema = self._schema()
+        if schema is None:
+            schema = table.schema
+        else:
+            try:
+                schema = pa.unify_schemas([schema, table.schema], promote_options='permissive')
+            except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+                raise ValueError(f"Trades do not match the store schema: {e}") from None
+        for field in schema:
+            if field.name not in table.column_names:
+                table = table.append_column(field, pa.nulls(len(table), field.type))
+        self._manifest['schema'] = base64.b64encode(schema.serialize().to_pybytes()).decode()
+        return table.select(schema.names).cast(schema)
+
+    def _write_manifest(self):
+        # Write to a temporary file first so readers never see a partial manifest
+        tmp_path = os.path.join(self.directory, f".{uuid.uuid4().hex}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(self._manifest, f, indent=1)
+        os.replace(tmp_path, os.path.join(self.directory, MANIFEST))
+
+    @property
+    def days(self):
+        """Stored days as sorted 'YYYY-MM-DD' strings"""
+        return sorted(self._manifest['partitions'])
+
+    @property
+    def n_trades(self):
+        return sum(
+            part['rows'] for parts in self._manifest['partitions'].values() for part in parts
+        )
+
+    def _open_part(self, part):
+        import pyarrow as pa
+
+        with pa.memory_map(os.path.join(self.directory, part['file']), 'r') as source:
+            return pa.ipc.open_file(source).read_all()
+
+    def _to_table(self, trades):
+        """
+        Arrow table of trades in the store schema: float columns as float64,
+        categoricals as int32-indexed dictionaries and constant columns from
+        attrs as real columns, in the store's column order
+        """
+        import pyarrow as pa
+
+        frame = pd.DataFrame(index=trades.index)
+        for column in trades.columns:
+            values = trades[column]
+            if pd.api.types.is_float_dtype(values.dtype):
+                values = values.astype(np.float64)
+            elif pd.api.types.is_string_dtype(values.dtype) or values.dtype == object:
+                values = values.astype('category')
+            frame[column] = values
+        for column, value in trades.attrs.get('constant_columns', {}).items():
+            frame[column] = pd.Categorical.from_codes(np.zeros(len(frame), dtype=np.int8), [value])
+
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        # Drop the pandas metadata, which describes only this export's columns
+        schema = pa.schema([
+            field.with_type(pa.dictionary(pa.int32(), pa.string()))
+            if pa.types.is_dictionary(field.type) else field
+            for field in table.schema
+        ])
+        table = table.cast(schema).append_column(_HASH_COLUMN, pa.nulls(len(table), pa.uint64()))
+        # Hash after conforming, so column order and dtypes do not matter
+        table = self._conform(table)
+        return table.set_column(
+            table.schema.get_field_index(_HASH_COLUMN), _HASH_COLUMN, pa.array(_row_hashes(table))
+        )
+
+    def append(self, trades, source=None):
+        """
+        Add a trade frame (as returned by load_data) to the store
+
+        Trades already in the store are skipped.  Returns the number of
+        trades added.  source is an optional label (e.g. the export file
+        name) recorded with each new part.
+        """
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        if not len(trades):
+            return 0
+        table = self._to_table(trades)
+        timestamps = trades['timestamp']
+        if getattr(timestamps.dt, 'tz', None) is not None:
+            timestamps = timestamps.dt.tz_localize(None)
+        days = timestamps.to_numpy().astype('datetime64[D]')
+
+        # Drop rows already stored, counting repeats so that k identical
+        # fills in an export match k identical fills in the store
+        day_names = np.datetime_as_string(np.unique(days), unit='D')
+        existing = [
+            self._open_part(part).column(_HASH_COLUMN).to_numpy()
+            for day in day_names for part in self._manifest['partitions'].get(day, [])
+        ]
+        hashes = table.column(_HASH_COLUMN).to_numpy()
+        keep = np.ones(len(hashes), dtype=bool)
+        if existing:
+            stored, stored_counts = np.unique(np.concatenate(existing), return_counts=True)
+            order = np.argsort(hashes, kind='stable')
+            sorted_hashes = hashes[order]
+            first = np.searchsorted(sorted_hashes, sorted_hashes, side='left')
+            occurrence = np.arange(len(sorted_hashes)) - first
+            slot = np.minimum(np.searchsorted(stored, sorted_hashes), len(stored) - 1)
+            already = np.where(stored[slot] == sorted_hashes, stored_counts[slot], 0)
+            keep[order] = occurrence >= already
+
+        table = table.filter(pa.array(keep))
+        days = days[keep]
+        if not len(days):
+            return 0
+
+        os.makedirs(self.directory, exist_ok=True)
+        port_ids = table.column('Port_IDs').to_numpy()
+        row_times = timestamps.to_numpy()[keep]
+        for day in np.unique(days):
+            rows = np.flatnonzero(days == day)
+            rows = rows[np.lexsort((row_times[rows], port_ids[rows]))]
+            part_table = table.take(pa.array(rows))
+            day_name = str(day)
+            file_name = os.path.join(day_name, f"part-{self._manifest['next_part']:06d}.arrow")
+            self._manifest['next_part'] += 1
+            self._write_part(file_name, part_table)
+
+            bounds = pc.min_max(part_table.column('Port_IDs'))
+            self._manifest['partitions'].setdefault(day_name, []).append({
+                'file': file_name,
+                'rows': len(rows),
+                'min_port_id': bounds['min'].as_py(),
+                'max_port_id': bounds['max'].as_py(),
+                'source': source,
+            })
+        self._write_manifest()
+        return int(keep.sum())
+
+    def _write_part(self, file_name, table):
+        import pyarrow as pa
+
+        path = os.path.join(self.directory, file_name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = os.path.join(os.path.dirname(path), f".{uuid.uuid4().hex}.tmp")
+        try:
+            with pa.OSFile(tmp_path, 'wb') as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def read(self, start=None, end=None, port_ids=None, columns=None):
+        """
+        Trades with start <= timestamp < end for the given Port_IDs
+
+        start and end are anything pd.Timestamp accepts (None = unbounded);
+        port_ids is one Port_ID or a list (None = every account); columns
+        limits the columns returned.  Only the parts for matching days and
+        Port_IDs ranges are opened.  Rows come back ordered by day, then
+        Port_IDs and time.
+        """
+        import pyarrow as pa
+
+        start = None if start is None else pd.Timestamp(start)
+        end = None if end is None else pd.Timestamp(end)
+        if port_ids is not None:
+            port_ids = np.unique(np.atleast_1d(np.asarray(port_ids, dtype=np.int64)))
+
+        tables = []
+        for day in self.days:
+            day_start = pd.Timestamp(day)
+            if (start is not None and day_start + pd.Timedelta(days=1) <= start) or \
+                    (end is not None and day_start >= end):
+                continue
+            for part in self._manifest['partitions'][day]:
+                if port_ids is not None:
+                    wanted = port_ids[
+                        (port_ids >= part['min_port_id']) & (port_ids <= part['max_port_id'])
+                    ]
+                    if not len(wanted):
+                        continue
+                table = self._open_part(part)
+                if port_ids is not None:
+                    table = table.take(pa.array(self._account_rows(table, wanted)))
+                if (start is not None and day_start < start) or \
+                        (end is not None and day_start + pd.Timedelta(days=1) > end):
+                    table = table.filter(pa.array(self._time_mask(table, start, end)))
+                tables.append(table)
+
+        if not tables:
+            return pd.DataFrame()
+        # Parts written before the schema gained a column lack it
+        table = pa.concat_tables(tables, promote_options='permissive')
+        keep = [name for name in self._schema().names if name != _HASH_COLUMN]
+        if columns is not None:
+            keep = [name for name in columns if name in keep]
+        data = table.select(keep).to_pandas(split_blocks=True)
+
+        # Asset columns with one value go back to attrs, as in apply_dtype_plan
+        constants = {}
+        for column in CONSTANT_CANDIDATES:
+            if column in data.columns and len(data[column].cat.categories) == 1 \
+                    and not data[column].hasnans:
+                constants[column] = data[column].cat.categories[0]
+        if constants:
+            data = data.drop(columns=list(constants))
+            data.attrs['constant_columns'] = constants
+        return data
+
+    @staticmethod
+    def _account_rows(table, port_ids):
+        """Row numbers of the given accounts in a part sorted by Port_IDs"""
+        column = table.column('Port_IDs').to_numpy()
+        lower = np.searchsorted(column, port_ids, side='left')
+        upper = np.searchsorted(column, port_ids, side='right')
+        lengths = upper - lower
+        offsets = np.repeat(lower - np.r_[0, np.cumsum(lengths)[:-1]], lengths)
+        return offsets + np.arange(lengths.sum())
+
+    @staticmethod
+    def _time_mask(table, start, end):
+        times = table.column('timestamp').to_numpy()
+        mask = np.ones(len(times), dtype=bool)
+        if start is not None:
+            mask &= times >= start.to_datetime64()
+        if end is not None:
+            mask &= times < end.to_datetime64()
+        return mask
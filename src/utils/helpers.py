@@ -6,7 +6,8 @@ def calculate_feature_engineering(data):
     """
     Perform feature engineering on trade data
     """
-    df = data.copy()
+    # Shallow copy: new columns go on df, the input columns are shared
+    df = data.copy(deep=False)
     
     # Time-based features
     df['hour'] = df['timestamp'].dt.hour
@@ -21,7 +22,7 @@ def calculate_feature_engineering(data):
     ).mean().reset_index(0, drop=True)
     
     # Calculate position size relative to account
-    df['position_size'] = df['price'] * df['quantity']
+    df['position_size'] = df['price'].astype(np.float64) * df['quantity'].astype(np.float64)
     df['relative_position_size'] = df.groupby('Port_IDs')['position_size'].transform(
         lambda x: x / x.mean()
     )
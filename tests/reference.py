@@ -0,0 +1,170 @@
+"""
+Reference implementations the tests compare the optimized code against
+
+Each is the straightforward version (a row-wise apply, a per-account loop,
+one pass per metric) that an optimization replaced.  The benchmarks time
+the same functions.
+"""
+import ast
+
+import numpy as np
+import pandas as pd
+
+from src.analysis.metrics import calculate_metrics
+from src.analysis.positions import FLAT_TOLERANCE
+from src.analysis.ranking import get_feature_importance, normalize_metrics
+from src.data.columnar import TradeColumns
+from src.data.parser import parse_trade_history, records_to_columns
+
+
+def position_label(side, position_side):
+    """preprocess_trades' position_type label, one row at a time"""
+    return f"{str(side).lower()}_{str(position_side).lower()}"
+
+def build_frame(histories, parse):
+    """Parse every history with parse and build the trade DataFrame"""
+    trade_columns = TradeColumns()
+    for port_id, history in histories:
+        columns, n_records = parse(history)
+        trade_columns.append(columns, n_records, port_id)
+    return trade_columns.to_frame()
+
+def parse_with_ast(history):
+    """parse_trade_history as it was: ast.literal_eval on every history"""
+    return records_to_columns(ast.literal_eval(history))
+
+def build_from_dicts(path):
+    """Trade DataFrame built from a list of per-trade dicts, as load_data was"""
+    data = pd.read_csv(path).dropna(subset=['Trade_History'])
+    trades_list = []
+    for port_id, history in zip(data['Port_IDs'], data['Trade_History']):
+        columns, n_records = parse_trade_history(history)
+        keys = list(columns)
+        for i in range(n_records):
+            trade = {key: columns[key][i] for key in keys}
+            trade['Port_IDs'] = port_id
+            trades_list.append(trade)
+    return pd.DataFrame(trades_list)
+
+def sharpe_loop(trades_df, risk_free_rate=0.02):
+    """calculate_sharpe_ratio as it was: a boolean mask per account"""
+    trades_df = trades_df.assign(date=trades_df['timestamp'].dt.date)
+    daily_returns = trades_df.groupby(['Port_IDs', 'date'])['realizedProfit'].sum().reset_index()
+    sharpe_ratios = {}
+    for port_id in daily_returns['Port_IDs'].unique():
+        port_returns = daily_returns[daily_returns['Port_IDs'] == port_id]['realizedProfit']
+        sharpe_ratio = 0
+        if len(port_returns) > 1:
+            excess_returns = port_returns - ((1 + risk_free_rate) ** (1/365) - 1)
+            std = excess_returns.std()
+            if std > 0:
+                sharpe_ratio = np.sqrt(365) * (excess_returns.mean() / std)
+        sharpe_ratios[port_id] = sharpe_ratio
+    return pd.Series(sharpe_ratios)
+
+def mdd_loop(trades_df):
+    """calculate_mdd as it was: a boolean mask per account"""
+    mdd_by_account = {}
+    for port_id in trades_df['Port_IDs'].unique():
+        port_trades = trades_df[trades_df['Port_IDs'] == port_id].sort_values('timestamp')
+        cumulative_returns = (1 + port_trades['realizedProfit']).cumprod()
+        drawdowns = cumulative_returns / cumulative_returns.expanding().max() - 1
+        mdd_by_account[port_id] = abs(drawdowns.min()) * 100
+    return pd.Series(mdd_by_account)
+
+def roi_groupby(trades_df):
+    """calculate_roi as it was"""
+    roi_by_account = trades_df.groupby('Port_IDs').agg({
+        'realizedProfit': 'sum',
+        'quantity': 'sum'
+    })
+    roi_by_account['roi'] = np.where(
+        roi_by_account['quantity'] != 0,
+        (roi_by_account['realizedProfit'] / roi_by_account['quantity']) * 100,
+        0
+    )
+    return roi_by_account['roi']
+
+
+def win_rate_groupby(trades_df):
+    """calculate_win_rate as it was"""
+    metrics_by_account = trades_df.groupby('Port_IDs').agg({
+        'realizedProfit': lambda x: (x > 0).sum()
+    }).join(
+        trades_df.groupby('Port_IDs').size().rename('total_positions')
+    )
+    metrics_by_account['win_rate'] = np.where(
+        metrics_by_account['total_positions'] > 0,
+        (metrics_by_account['realizedProfit'] / metrics_by_account['total_positions'] * 100),
+        0
+    )
+    return metrics_by_account
+
+
+def separate_passes(trades_df):
+    """
+    calculate_metrics as it was: five passes, each regrouping the table,
+    with the per-account Sharpe and drawdown loops
+    """
+    metrics = pd.DataFrame({
+        'roi': roi_groupby(trades_df),
+        'total_pnl': trades_df.groupby('Port_IDs')['realizedProfit'].sum(),
+        'sharpe_ratio': sharpe_loop(trades_df),
+        'max_drawdown': mdd_loop(trades_df),
+    })
+    win_metrics = win_rate_groupby(trades_df)
+    metrics['win_rate'] = win_metrics['win_rate']
+    metrics['win_positions'] = win_metrics['realizedProfit']
+    metrics['total_positions'] = win_metrics['total_positions']
+    return metrics.fillna(0)
+
+
+def per_symbol_metrics(trades):
+    """calculate_metrics on each symbol's trades, stacked into one frame"""
+    frames = {
+        symbol: calculate_metrics(trades[trades['symbol'] == symbol])
+        for symbol in trades['symbol'].unique()
+    }
+    stacked = pd.concat(frames, names=['symbol', 'Port_IDs'])
+    return stacked.swaplevel().sort_index()
+
+def regroup_curve(trades, port_id, freq):
+    """Equity curve of one account straight from the trades"""
+    account = trades[trades['Port_IDs'] == port_id]
+    return account.groupby(account['timestamp'].dt.floor(freq))['realizedProfit'].sum().cumsum()
+
+def full_sort(metrics_df, top_n):
+    """rank_accounts as it was: build every row, sort everything, take head"""
+    normalized_metrics = normalize_metrics(metrics_df)
+    weighted_scores = pd.Series(0, index=metrics_df.index)
+    for metric, weight in get_feature_importance().items():
+        weighted_scores += normalized_metrics[metric] * weight
+    rankings = pd.DataFrame({
+        'Port_IDs': metrics_df.index,
+        'Score': weighted_scores,
+        'ROI (%)': metrics_df['roi'].round(2),
+    })
+    return rankings.sort_values('Score', ascending=False).head(top_n)
+
+def loop_positions(trades):
+    """Walk every fill in Python; returns (n_positions, total realized PnL)"""
+    trades = trades.sort_values(['Port_IDs', 'symbol', 'positionSide', 'timestamp'], kind='stable')
+    n_positions = 0
+    total_pnl = 0.0
+    for _, fills in trades.groupby(['Port_IDs', 'symbol', 'positionSide'], sort=True):
+        net = scale = 0.0
+        is_open = False
+        for qty, side, pnl in zip(fills['qty'], fills['side'], fills['realizedProfit']):
+            signed = qty if side == 'BUY' else -qty
+            scale = max(scale, qty)
+            before, net = net, net + signed
+            tolerance = FLAT_TOLERANCE * scale
+            if not is_open:
+                n_positions += 1
+                is_open = True
+            elif abs(before) > tolerance and abs(net) > tolerance and np.sign(before) != np.sign(net):
+                n_positions += 1
+            total_pnl += pnl
+            if abs(net) <= tolerance:
+                is_open = False
+    return n_positions, total_pnl
@@ -0,0 +1,15 @@
+import pytest
+
+from benchmarks.bench_import import BUDGETS_MS, MODULES, UI_ONLY, import_profile, own_ms
+
+
+@pytest.mark.parametrize('module', MODULES)
+def test_module_does_not_import_ui_dependencies(module):
+    imported = {name.split('.')[0] for name in import_profile(module)}
+    assert not imported & set(UI_ONLY)
+
+
+@pytest.mark.parametrize('module', sorted(BUDGETS_MS))
+def test_import_time_within_budget(module):
+    # Best of a few cold imports, as bench_import reports
+    assert min(own_ms(import_profile(module), module) for _ in range(3)) <= BUDGETS_MS[module]
@@ -1,20 +1,194 @@
-binance-trade-analyzer
-├── src
-│   ├── __init__.py
-│   ├── analysis
-│   │   ├── __init__.py
-│   │   ├── metrics.py
-│   │   └── ranking.py
-│   ├── data
-│   │   ├── __init__.py
-│   │   └── loader.py
-│   └── utils
-│       ├── __init__.py
-│       └── helpers.py
-├── tests
-│   ├── __init__.py
-│   ├── test_metrics.py
-│   └── test_loader.py
-├── requirements.txt
-├── setup.py
-└── README.md
\ No newline at end of file
+import ast
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.bench_cache import load_cleaned
+from benchmarks.bench_classify import make_trades as make_sides
+from benchmarks.bench_memory import build_columnar, measure_mode
+from benchmarks.synthetic import make_trades, write_trades_csv
+from src.data.cache import TradeCache
+from src.data import ingest
+from src.data.ingest import iter_history_chunks, iter_trade_columns, parse_histories_parallel
+from src.data.dtypes import apply_dtype_plan
+from src.data.loader import (
+    classify_trade,
+    classify_trades,
+    clean_data,
+    concat_trades,
+    handle_missing_values,
+    iter_trades,
+    label_pairs,
+    load_data,
+    preprocess_trades,
+)
+from src.data.parser import parse_trade_history
+from src.data.reporting import LoggingReporter, PipelineStopped
+from tests.reference import build_frame, build_from_dicts, parse_with_ast, position_label
+
+
+@pytest.fixture
+def trades_csv(tmp_path):
+    path = tmp_path / 'trades.csv'
+    write_trades_csv(path, n_accounts=40, trades_per_account=30)
+    return path
+
+
+def test_classify_trades_matches_row_wise_apply():
+    trades = make_sides(5_000)
+    expected = trades.apply(classify_trade, axis=1)
+    assert (classify_trades(trades).astype(object) == expected.astype(object)).all()
+
+
+def test_label_pairs_matches_row_wise_apply():
+    trades = make_sides(5_000)
+    expected = trades.apply(lambda x: position_label(x['side'], x['positionSide']), axis=1)
+    result = label_pairs(trades['side'], trades['positionSide'], position_label)
+    assert (result.astype(object) == expected.astype(object)).all()
+
+
+def test_fast_parser_matches_literal_eval(trades_csv):
+    data = pd.read_csv(trades_csv)
+    histories = list(zip(data['Port_IDs'], data['Trade_History']))
+    pd.testing.assert_frame_equal(
+        build_frame(histories, parse_trade_history), build_frame(histories, parse_with_ast)
+    )
+
+
+@pytest.mark.parametrize('text', [
+    "[{'a': ['True'], 'b': 1}]",
+    "[{'a': {'k': 'False'}, 'b': 1}]",
+    "[{'a': [['None']], 'b': 1}]",
+    "{'x': 'None'}",
+    "[{'x': 'True', 'y': True}]",
+])
+def test_parser_keeps_constant_names_inside_strings(text):
+    trades = ast.literal_eval(text)
+    trades = trades if isinstance(trades, list) else [trades]
+    columns, n_records = parse_trade_history(text)
+    assert n_records == len(trades)
+    assert columns == {key: [trade[key] for trade in trades] for key in trades[0]}
+
+
+def test_parallel_parse_matches_serial(trades_csv):
+    data = pd.read_csv(trades_csv)
+    serial, _ = parse_histories_parallel(data['Port_IDs'], data['Trade_History'], workers=1)
+    parallel, _ = parse_histories_parallel(data['Port_IDs'], data['Trade_History'], workers=2)
+    pd.testing.assert_frame_equal(parallel.to_frame(), serial.to_frame())
+
+
+def test_parallel_chunks_share_one_pool(trades_csv, monkeypatch):
+    pools = []
+
+    class CountingPool(ingest.ProcessPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            pools.append(self)
+            super().__init__(*args, **kwargs)
+
+    serial = [columns.to_frame() for columns, _ in iter_trade_columns(trades_csv, 1024 ** 2)]
+    monkeypatch.setattr(ingest, 'ProcessPoolExecutor', CountingPool)
+    parallel = [columns.to_frame() for columns, _ in iter_trade_columns(trades_csv, 1024 ** 2, workers=2)]
+    assert len(serial) > 2
+    assert len(pools) == 1
+    pd.testing.assert_frame_equal(pd.concat(parallel, ignore_index=True), pd.concat(serial, ignore_index=True))
+
+
+def test_columnar_builder_matches_dict_list(trades_csv):
+    pd.testing.assert_frame_equal(build_columnar(trades_csv), build_from_dicts(trades_csv))
+
+
+def test_columnar_builder_peak_rss_below_dict_list(tmp_path):
+    path = tmp_path / 'trades.csv'
+    write_trades_csv(path, n_accounts=500, trades_per_account=100)
+    dicts = measure_mode('dicts', path)
+    columnar = measure_mode('columnar', path)
+    assert columnar['rows'] == dicts['rows']
+    assert columnar['peak_bytes'] < dicts['peak_bytes']
+
+
+def test_load_data_round_trips_synthetic_csv(trades_csv):
+    expected = pd.read_csv(trades_csv)
+    trades = load_data(trades_csv, reporter=LoggingReporter())
+    assert len(trades) == sum(len(ast.literal_eval(history)) for history in expected['Trade_History'])
+    assert set(trades['Port_IDs']) == set(expected['Port_IDs'])
+
+
+def test_chunked_load_matches_whole_file(trades_csv):
+    reporter = LoggingReporter()
+    whole = load_data(trades_csv, reporter=reporter)
+    chunked = load_data(trades_csv, memory_budget=64 * 1024, reporter=reporter)
+    pd.testing.assert_frame_equal(chunked, whole)
+
+
+def test_cached_table_matches_cold_load(trades_csv, tmp_path):
+    cache = TradeCache(tmp_path / 'cache')
+    cold = load_cleaned(trades_csv, cache)
+    warm = load_cleaned(trades_csv, cache)
+    pd.testing.assert_frame_equal(warm, cold)
+
+
+def test_cache_returns_writable_copies_on_request(tmp_path):
+    cache = TradeCache(tmp_path / 'cache')
+    cache.put('trades', make_trades(5, 10))
+    mapped = cache.get('trades')
+    with pytest.raises(ValueError):
+        mapped.loc[0, 'fee'] = 1.0
+    trades = cache.get('trades', writable=True)
+    trades.loc[0, 'fee'] = 1.0
+    assert trades.loc[0, 'fee'] == 1.0
+    assert cache.get('trades').loc[0, 'fee'] != 1.0
+
+
+def test_handle_missing_values_leaves_its_input_alone():
+    trades = make_trades(5, 10)
+    trades.loc[trades.index[:3], ['fee', 'feeAsset']] = np.nan
+    before = trades.copy()
+    handle_missing_values(trades, reporter=LoggingReporter())
+    pd.testing.assert_frame_equal(trades, before)
+
+
+def test_clean_data_leaves_its_input_alone(trades_csv):
+    trades = load_data(trades_csv, reporter=LoggingReporter())
+    before = trades.copy()
+    cleaned = clean_data(trades)
+    pd.testing.assert_frame_equal(trades, before)
+    assert 'trade_type' in cleaned.columns
+    assert cleaned.index.equals(pd.RangeIndex(len(trades)))
+
+
+def test_chunked_read_of_header_only_csv(tmp_path, caplog):
+    path = tmp_path / 'empty.csv'
+    path.write_text('Port_IDs,Trade_History\n')
+    assert list(iter_history_chunks(path, 64 * 1024)) == []
+    with pytest.raises(PipelineStopped):
+        load_data(path, memory_budget=64 * 1024, reporter=LoggingReporter())
+    assert "No valid trades found" in caplog.text
+
+
+def test_concatenated_chunks_match_whole_file(trades_csv):
+    reporter = LoggingReporter()
+    frames = list(iter_trades(trades_csv, memory_budget=64 * 1024, reporter=reporter))
+    assert len(frames) > 1
+    pd.testing.assert_frame_equal(concat_trades(frames), load_data(trades_csv, reporter=reporter))
+
+
+def test_preprocess_trades_computes_in_float64():
+    trades = make_trades(20, 30)
+    # Prices in quarters below 2 ** 20 are exact float32 values
+    trades['price'] = (trades['price'].clip(upper=2 ** 20) * 4).round() / 4
+    compact = apply_dtype_plan(trades.copy())
+    assert compact['price'].dtype == np.float32
+    result = preprocess_trades(compact, reporter=LoggingReporter())
+    assert result['trade_value'].dtype == np.float64
+    expected = (trades['price'] * trades['quantity']).sort_index()
+    assert np.array_equal(result['trade_value'].sort_index().to_numpy(), expected.to_numpy())
+
+
+def test_missing_categorical_values_are_filled():
+    trades = apply_dtype_plan(make_trades(5, 10))
+    trades.loc[trades.index[:3], 'symbol'] = np.nan
+    result = handle_missing_values(trades, reporter=LoggingReporter())
+    assert isinstance(result['symbol'].dtype, pd.CategoricalDtype)
+    assert (result['symbol'].iloc[:3] == 'Unknown').all()
+    assert not result['symbol'].hasnans
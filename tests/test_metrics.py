@@ -1,20 +1,164 @@
-binance-trade-analyzer
-├── src
-│   ├── __init__.py
-│   ├── analysis
-│   │   ├── __init__.py
-│   │   ├── metrics.py
-│   │   └── ranking.py
-│   ├── data
-│   │   ├── __init__.py
-│   │   └── loader.py
-│   └── utils
-│       ├── __init__.py
-│       └── helpers.py
-├── tests
-│   ├── __init__.py
-│   ├── test_metrics.py
-│   └── test_loader.py
-├── requirements.txt
-├── setup.py
-└── README.md
\ No newline at end of file
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.bench_ranking import make_metrics
+from benchmarks.synthetic import make_trades
+from src.analysis.bootstrap import bootstrap_metrics
+from src.analysis.equity import EquityCube
+from src.analysis.incremental import MetricsState
+from src.analysis.metrics import (
+    calculate_mdd,
+    calculate_metrics,
+    calculate_sharpe_ratio,
+    calculate_symbol_metrics,
+)
+from src.analysis.positions import reconstruct_positions
+from src.analysis.ranking import metric_matrix, rank_accounts, score_accounts, score_profiles
+from src.data.accounts import AccountIndex, sort_by_account
+from tests.reference import (
+    full_sort,
+    mdd_loop,
+    per_symbol_metrics,
+    regroup_curve,
+    separate_passes,
+    sharpe_loop,
+)
+
+
+@pytest.fixture(scope='module')
+def trades():
+    trades = make_trades(200, 40)
+    # Unique timestamps per account keep max_drawdown independent of how
+    # each implementation orders tied fills
+    return trades.drop_duplicates(['Port_IDs', 'timestamp'], ignore_index=True)
+
+
+def test_fused_kernel_matches_separate_passes(trades):
+    expected = separate_passes(trades.copy())
+    result = calculate_metrics(trades)
+    pd.testing.assert_frame_equal(
+        result[expected.columns], expected, check_index_type=False, check_names=False, rtol=1e-9
+    )
+
+
+def test_segment_sharpe_and_mdd_match_loops(trades):
+    pd.testing.assert_series_equal(
+        calculate_sharpe_ratio(trades).sort_index(), sharpe_loop(trades).sort_index(),
+        check_index_type=False, rtol=1e-9
+    )
+    pd.testing.assert_series_equal(
+        calculate_mdd(trades).sort_index(), mdd_loop(trades).sort_index(),
+        check_index_type=False, rtol=1e-9
+    )
+
+
+def test_incremental_update_matches_full_recompute(trades):
+    ordered = trades.sort_values('timestamp', kind='stable', ignore_index=True)
+    state = MetricsState()
+    for batch in np.array_split(np.arange(len(ordered)), 5):
+        state.update(ordered.iloc[batch])
+    pd.testing.assert_frame_equal(
+        state.metrics(), calculate_metrics(ordered),
+        check_index_type=False, check_names=False, rtol=1e-9
+    )
+
+
+def test_incremental_rejects_stale_fills(trades):
+    ordered = trades.sort_values('timestamp', kind='stable', ignore_index=True)
+    state = MetricsState().update(ordered.iloc[len(ordered) // 2:])
+    with pytest.raises(ValueError):
+        state.update(ordered.iloc[:len(ordered) // 2])
+
+
+def test_account_index_gives_the_same_metrics(trades):
+    indexed = sort_by_account(trades)
+    index = AccountIndex.from_sorted(indexed['Port_IDs'])
+    pd.testing.assert_frame_equal(
+        calculate_metrics(indexed, account_index=index), calculate_metrics(trades)
+    )
+    port_id = index.port_ids[len(index) // 2]
+    pd.testing.assert_frame_equal(
+        index.rows(indexed, port_id), indexed[indexed['Port_IDs'] == port_id]
+    )
+
+
+def test_empty_account_index(trades):
+    index = AccountIndex.from_sorted(trades['Port_IDs'].iloc[:0])
+    assert len(index) == 0
+    assert index.counts().tolist() == []
+    assert 0 not in index
+
+
+def test_sorted_input_also_gets_a_fresh_index(trades):
+    indexed = sort_by_account(trades)
+    shifted = indexed.set_axis(indexed.index + 10)
+    assert sort_by_account(shifted).index.equals(pd.RangeIndex(len(indexed)))
+
+
+def test_account_index_rejects_unsorted_trades(trades):
+    with pytest.raises(ValueError):
+        AccountIndex.from_sorted(trades['Port_IDs'].iloc[::-1])
+
+
+def test_symbol_metrics_match_per_symbol_runs():
+    trades = make_trades(100, 40, n_symbols=8)
+    pd.testing.assert_frame_equal(
+        calculate_symbol_metrics(trades), per_symbol_metrics(trades), check_index_type=False
+    )
+
+
+def test_equity_curve_matches_regrouped_trades(trades):
+    cube = EquityCube.from_trades(trades, '1h')
+    port_id = cube.accounts[len(cube.accounts) // 2]
+    expected = regroup_curve(trades, port_id, 'h')
+    assert np.allclose(cube.equity_curve(port_id).to_numpy(), expected.to_numpy())
+
+
+def test_bootstrap_is_independent_of_worker_count(trades):
+    serial = bootstrap_metrics(trades, n_resamples=50, workers=1)
+    parallel = bootstrap_metrics(trades, n_resamples=50, workers=2)
+    assert np.array_equal(serial.to_numpy(), parallel.to_numpy())
+
+
+def test_partial_top_n_matches_full_sort():
+    metrics = make_metrics(5_000)
+    expected = full_sort(metrics, 20)
+    assert rank_accounts(metrics, 20)['Port_IDs'].tolist() == expected['Port_IDs'].tolist()
+
+
+def test_accounts_without_wins_rank_worst_on_fee_to_profit(trades):
+    trades = trades.copy()
+    loser = trades['Port_IDs'].iloc[0]
+    losing = trades['Port_IDs'] == loser
+    trades.loc[losing, 'realizedProfit'] = -trades.loc[losing, 'realizedProfit'].abs()
+    metrics = calculate_metrics(trades)
+    assert np.isnan(metrics.at[loser, 'fee_to_profit'])
+    ranks = score_accounts(metrics, weights={'fee_to_profit': 1.0})['Rank']
+    assert ranks[loser] == ranks.max()
+
+
+def test_infinite_drawdown_keeps_the_baseline_score():
+    metrics = make_metrics(100)
+    metrics.iloc[:5, metrics.columns.get_loc('max_drawdown')] = np.inf
+    zeroed = metrics.replace(np.inf, 0)
+    assert np.array_equal(metric_matrix(metrics), metric_matrix(zeroed))
+
+
+def test_metrics_without_fee_columns_still_rank(trades):
+    metrics = calculate_metrics(trades)
+    original = metrics[['roi', 'total_pnl', 'sharpe_ratio', 'max_drawdown', 'win_rate',
+                        'win_positions', 'total_positions']]
+    expected = rank_accounts(metrics, 10)
+    rankings = rank_accounts(original, 10)
+    assert rankings['Port_IDs'].tolist() == expected['Port_IDs'].tolist()
+    assert 'Net PnL' not in rankings.columns
+    assert 'cost-aware' not in score_profiles(original).columns
+    with pytest.raises(ValueError):
+        rank_accounts(original, 10, weights='cost-aware')
+
+
+def test_position_fees_are_positive_like_total_fees(trades):
+    positions = reconstruct_positions(trades)
+    assert (positions['fee'] >= 0).all()
+    assert np.isclose(positions['fee'].sum(), calculate_metrics(trades)['total_fees'].sum())
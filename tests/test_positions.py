@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import make_trades
+from src.analysis.positions import reconstruct_positions
+from tests.reference import loop_positions
+
+
+def test_vectorized_positions_match_fill_loop():
+    trades = make_trades(100, 60)
+    positions = reconstruct_positions(trades)
+    n_positions, total_pnl = loop_positions(trades)
+    assert len(positions) == n_positions
+    assert np.isclose(positions['realized_pnl'].sum(), total_pnl)
+
+
+def test_round_trip_closes_one_position():
+    trades = make_trades(1, 2)
+    trades = trades.iloc[:1].loc[[0, 0]].reset_index(drop=True)
+    trades['side'] = ['BUY', 'SELL']
+    trades['timestamp'] = trades['timestamp'] + np.array([0, 60_000], dtype='timedelta64[ms]')
+    positions = reconstruct_positions(trades)
+    assert len(positions) == 1
+    assert positions['is_closed'].iloc[0]
+    assert positions['direction'].iloc[0] == 'LONG'
+
+
+def test_no_valid_fills_give_an_empty_frame():
+    trades = make_trades(5, 10)
+    expected = reconstruct_positions(trades).iloc[:0]
+    empty = reconstruct_positions(trades.iloc[:0])
+    pd.testing.assert_series_equal(empty.dtypes, expected.dtypes)
+    assert len(empty) == 0
+
+    trades['side'] = 'UNKNOWN'
+    pd.testing.assert_frame_equal(reconstruct_positions(trades), empty)
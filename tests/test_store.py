@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import make_trades
+from src.data.dtypes import apply_dtype_plan
+from src.data.store import TradeStore
+
+
+@pytest.fixture
+def history():
+    return apply_dtype_plan(make_trades(50, 60, days=30))
+
+
+def _sorted(trades):
+    return trades.sort_values(['Port_IDs', 'timestamp'], kind='stable', ignore_index=True)
+
+
+def test_append_and_read_round_trip(tmp_path, history):
+    store = TradeStore(tmp_path)
+    assert store.append(history) == len(history)
+
+    read = TradeStore(tmp_path).read()
+    assert read.attrs == history.attrs
+    pd.testing.assert_frame_equal(
+        _sorted(read), _sorted(history)[read.columns], check_dtype=False, check_categorical=False
+    )
+
+
+def test_overlapping_appends_store_each_trade_once(tmp_path, history):
+    store = TradeStore(tmp_path)
+    middle = history['timestamp'].sort_values().iloc[len(history) // 2]
+    store.append(history[history['timestamp'] < middle + pd.Timedelta(days=3)])
+    store.append(history[history['timestamp'] >= middle - pd.Timedelta(days=3)])
+    assert store.n_trades == len(history)
+
+
+def test_read_by_day_and_account(tmp_path, history):
+    store = TradeStore(tmp_path)
+    store.append(history)
+    day = store.days[1]
+    one_day = store.read(day, pd.Timestamp(day) + pd.Timedelta(days=1))
+    assert len(one_day) == (history['timestamp'].dt.strftime('%Y-%m-%d') == day).sum()
+
+    port_id = history['Port_IDs'].iloc[0]
+    assert len(store.read(port_ids=port_id)) == (history['Port_IDs'] == port_id).sum()
+
+
+def test_differently_shaped_exports_read_back(tmp_path):
+    first = apply_dtype_plan(make_trades(20, 30, days=10))
+    second = make_trades(20, 30, days=10, seed=1)
+    second['timestamp'] += pd.Timedelta(days=20)
+    second['feeAsset'] = np.where(np.arange(len(second)) % 2, 'BNB', 'USDT')
+    second = apply_dtype_plan(second[second.columns[::-1]])
+    assert 'feeAsset' in first.attrs['constant_columns'] and 'feeAsset' in second.columns
+
+    store = TradeStore(tmp_path)
+    store.append(first)
+    store.append(second)
+    read = TradeStore(tmp_path).read()
+    # First export's order, then its constant columns; feeAsset now varies
+    assert list(read.columns) == [*first.columns, 'feeAsset']
+    assert 'feeAsset' not in read.attrs['constant_columns']
+
+    expected = pd.concat([first.assign(feeAsset='USDT'), second], ignore_index=True)
+    pd.testing.assert_frame_equal(
+        _sorted(read), _sorted(expected)[read.columns], check_dtype=False, check_categorical=False
+    )
+
+
+def test_reordered_retyped_export_is_not_stored_twice(tmp_path, history):
+    store = TradeStore(tmp_path)
+    store.append(history)
+    reexport = history[history.columns[::-1]].astype({'symbol': object, 'side': str})
+    reexport['timestamp'] = reexport['timestamp'].dt.as_unit('us')
+    assert store.append(reexport) == 0
+    assert store.n_trades == len(history)
+
+
+def test_reimport_after_new_column_is_not_stored_twice(tmp_path):
+    first = apply_dtype_plan(make_trades(20, 30, days=10))
+    second = make_trades(20, 30, days=10, seed=1)
+    second['timestamp'] += pd.Timedelta(days=20)
+    second['note'] = 'x'
+    second = apply_dtype_plan(second)
+
+    store = TradeStore(tmp_path)
+    store.append(first)
+    store.append(second)
+    assert store.append(first) == 0
+    assert store.n_trades == len(first) + len(second)